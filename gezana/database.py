@@ -0,0 +1,38 @@
+"""
+Database connection settings for the supported pooling modes.
+
+persistent  each worker keeps its connections for DB_CONN_MAX_AGE seconds and
+            checks them before reuse, so a connection dropped while idle is
+            replaced rather than failing the first query (default).
+pgbouncer   DATABASE_URL points at PgBouncer in transaction pooling mode.
+            Connections stay persistent but server-side cursors are disabled,
+            because a cursor cannot outlive its transaction there.
+pool        psycopg 3 connection pool inside each worker (Django 5.1+).
+none        a new connection for every request.
+"""
+import django
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+POOL_MODES = ("persistent", "pgbouncer", "pool", "none")
+
+
+def database_config(url, mode="persistent", conn_max_age=600, ssl_require=False, pool_min_size=2, pool_max_size=10):
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}.")
+
+    persistent = mode in ("persistent", "pgbouncer")
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=conn_max_age if persistent else 0,
+        conn_health_checks=persistent,
+        disable_server_side_cursors=mode == "pgbouncer",
+        ssl_require=ssl_require,
+    )
+
+    if mode == "pool":
+        if django.VERSION < (5, 1) or config["ENGINE"] != "django.db.backends.postgresql":
+            raise ImproperlyConfigured("DB_POOL_MODE=pool needs Django 5.1+ and PostgreSQL with psycopg 3.")
+        config["OPTIONS"]["pool"] = {"min_size": pool_min_size, "max_size": pool_max_size}
+
+    return config
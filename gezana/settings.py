@@ -13,7 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-import dj_database_url
+
+from gezana.database import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -71,13 +72,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in per-view timings: Server-Timing headers, Prometheus histograms at
+# /metrics/ and a warning for requests over the query budget. /metrics/ is
+# for signed-in staff, and for scrapers sending "Authorization: Bearer
+# <METRICS_TOKEN>" when METRICS_TOKEN is set.
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "False") == "True"
+INSTRUMENTATION_QUERY_BUDGET = int(os.getenv("INSTRUMENTATION_QUERY_BUDGET", "20"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "gezana_app.middleware.InstrumentationMiddleware")
+
 ROOT_URLCONF = 'gezana.urls'
 
+# Serve the booking and menu views from views_async.py. Only worth it under
+# an ASGI server, e.g.
+#   gunicorn gezana.asgi:application -k uvicorn_worker.UvicornWorker
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -85,6 +101,17 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept in every mode; the development
+            # autoreloader still empties the cache when a template changes.
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -97,11 +124,15 @@ WSGI_APPLICATION = 'gezana.wsgi.application'
 
 
 
+# DB_POOL_MODE is persistent, pgbouncer, pool or none; see gezana/database.py.
 DATABASES = {
-    "default": dj_database_url.config(
-        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
+    "default": database_config(
+        os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+        mode=os.getenv("DB_POOL_MODE", "persistent"),
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "600")),
         ssl_require=not DEBUG,
+        pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
     )
 }
 
@@ -109,6 +140,81 @@ DATABASES = {
 
 
 
+# Cache (local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared store such as Redis or Memcached when running several workers)
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "gezana"),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    # The default 300 entries cannot hold one menu card fragment per dish;
+    # culling would evict the menu version and cached querysets with them.
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "10000"))}
+
+# Sessions are read from the cache and only fall back to the database on a
+# miss; "django.contrib.sessions.backends.signed_cookies" needs no storage at all.
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+
+# Seconds the signed link to a booking's confirmation page stays valid.
+BOOKING_SUCCESS_TOKEN_MAX_AGE = int(os.getenv("BOOKING_SUCCESS_TOKEN_MAX_AGE", "900"))
+
+# How many days ahead the availability grid answers for; later dates are
+# rejected so arbitrary dates cannot each fill an entry of the cache below.
+BOOKING_HORIZON_DAYS = int(os.getenv("BOOKING_HORIZON_DAYS", "180"))
+
+# Seconds a date's booking availability stays cached; booking writes for the
+# date invalidate it immediately.
+AVAILABILITY_CACHE_TIMEOUT = int(os.getenv("AVAILABILITY_CACHE_TIMEOUT", "3600"))
+
+# Seconds a date's rendered service sheet stays cached; booking writes for
+# the date invalidate it immediately, like the availability above.
+SERVICE_SHEET_CACHE_TIMEOUT = int(os.getenv("SERVICE_SHEET_CACHE_TIMEOUT", "3600"))
+
+# Seconds cached menu querysets live; MenuItem saves and deletes bump the
+# menu version, so stale entries are never served.
+MENU_CACHE_TIMEOUT = int(os.getenv("MENU_CACHE_TIMEOUT", "86400"))
+
+# Identifies the deployed code in the menu pages' ETags, alongside the static
+# manifest hash, so a deploy that changes templates invalidates browser copies.
+# Heroku's dyno metadata sets HEROKU_SLUG_COMMIT.
+BUILD_ID = os.getenv("BUILD_ID", os.getenv("HEROKU_SLUG_COMMIT", ""))
+
+# Seconds rendered menu cards ({% cache %} fragments keyed by the menu
+# version) live; 0 renders them on every request.
+MENU_FRAGMENT_CACHE_TIMEOUT = int(os.getenv("MENU_FRAGMENT_CACHE_TIMEOUT", str(MENU_CACHE_TIMEOUT)))
+
+# Seconds the home, about and contact pages are cached for anonymous
+# visitors; 0 disables it. Keep it short: template changes are not detected.
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "600"))
+
+# Token-bucket limits on POSTs to the booking forms, GETs of the availability
+# grid and of booking pages by reference, as "N/second|minute|hour|day" (an
+# empty rate turns that bucket off). "booking", "availability", "lookup" and
+# "cancel" are per client IP; "reference" is per booking reference looked up
+# or cancelled.
+# Buckets live in THROTTLE_CACHE, so point it at a shared cache to limit
+# across workers; locmem limits each process separately.
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "True") == "True"
+THROTTLE_CACHE = os.getenv("THROTTLE_CACHE", "default")
+THROTTLE_RATES = {
+    "booking": os.getenv("THROTTLE_BOOKING_RATE", "10/hour"),
+    "availability": os.getenv("THROTTLE_AVAILABILITY_RATE", "120/hour"),
+    "lookup": os.getenv("THROTTLE_LOOKUP_RATE", "30/hour"),
+    "cancel": os.getenv("THROTTLE_CANCEL_RATE", "10/hour"),
+    "reference": os.getenv("THROTTLE_REFERENCE_RATE", "10/hour"),
+}
+# META key of the header the trusted reverse proxy puts the client address in,
+# e.g. "HTTP_X_FORWARDED_FOR"; empty uses REMOTE_ADDR. Never set it without
+# such a proxy in front: clients could then pick their own address. On Heroku
+# (DYNO is set) REMOTE_ADDR is the router's, shared by every visitor, and the
+# router appends the client's address to X-Forwarded-For, so that is the default.
+THROTTLE_CLIENT_IP_HEADER = os.getenv(
+    "THROTTLE_CLIENT_IP_HEADER", "HTTP_X_FORWARDED_FOR" if os.getenv("DYNO") else ""
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -168,17 +274,35 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "Gezana Booking <gezanabooking@gmail.com>")
 
+# Booking emails are queued in OutboundEmail and sent by
+# `python manage.py send_queued_email --loop` (the Procfile worker).
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv("EMAIL_OUTBOX_RETRY_SECONDS", "60"))
+
 # Cloudinary configuration
 CLOUDINARY_URL = os.environ.get("CLOUDINARY_URL")
 
 # Media (uploads)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"  # local dev only
+# Storage saves every upload under a fresh name instead of overwriting one,
+# so media responses can be cached for a year.
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
 
 # Storage backends (Django 4.2+)
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
-    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    # WhiteNoise hashing and Brotli/gzip precompression, after CSS
+    # minification and image optimization (gezana_app/storage.py).
+    "staticfiles": {"BACKEND": "gezana_app.storage.StaticPipelineStorage"},
+}
+
+# collectstatic downscales these static images to about twice their
+# largest displayed width.
+STATIC_IMAGE_MAX_WIDTHS = {
+    "images/gezana_logo.png": 184,
+    "images/no_image_available.png": 800,
 }
 
 # If Cloudinary is configured, store uploaded media there
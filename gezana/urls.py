@@ -14,14 +14,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from gezana_app.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('gezana_app.urls')),
+    path('', include('gezana_app.urls_async' if settings.ASYNC_VIEWS else 'gezana_app.urls')),
 ]
-from django.conf import settings
-from django.conf.urls.static import static
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
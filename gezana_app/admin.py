@@ -1,6 +1,101 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .booking_io import csv_lines, export_rows
+from .forms import BookingAdminForm, BookingForm
+from .models import Booking, MenuItem, OutboundEmail, Table
+from .services import reoptimize_date
+
+# Below this many rows the planner estimate is not worth trusting over COUNT(*).
+ESTIMATED_COUNT_MIN_ROWS = 100_000
+# The bookings list opens on this many days from today.
+UPCOMING_DAYS = 14
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the size of an unfiltered table from the PostgreSQL
+    planner statistics instead of running COUNT(*) over every row.
+
+    Filtered lists, small tables and other databases are counted as usual.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_MIN_ROWS:
+                return int(row[0])
+        return super().count
+
+
+class BookingPeriodFilter(admin.SimpleListFilter):
+    """
+    The next UPCOMING_DAYS days unless asked otherwise, so neither the list
+    nor its date hierarchy ever starts from the whole history.
+    """
+
+    title = "period"
+    parameter_name = "period"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        # Drilling into the date hierarchy picks the days itself.
+        self.default = "all" if any(key.startswith("date__") for key in params) else "upcoming"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("upcoming", f"Next {UPCOMING_DAYS} days"),
+            ("future", "From today"),
+            ("past", "Past"),
+            ("all", "All"),
+        )
 
-from .models import Booking, MenuItem, Table
+    def value(self):
+        return super().value() or self.default
+
+    def choices(self, changelist):
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        today = timezone.localdate()
+        if self.value() == "upcoming":
+            return queryset.filter(date__gte=today, date__lt=today + timedelta(days=UPCOMING_DAYS))
+        if self.value() == "future":
+            return queryset.filter(date__gte=today)
+        if self.value() == "past":
+            return queryset.filter(date__lt=today)
+        return queryset
+
+
+class BookingTimeFilter(admin.SimpleListFilter):
+    """The booking slots, listed from the form instead of a DISTINCT scan of every booking."""
+
+    title = "time"
+    parameter_name = "time"
+
+    def lookups(self, request, model_admin):
+        return BookingForm.TIME_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(time=self.value())
+        return queryset
 
 
 @admin.register(MenuItem)
@@ -26,12 +121,49 @@ class MenuItemAdmin(admin.ModelAdmin):
 
 @admin.register(Table)
 class TableAdmin(admin.ModelAdmin):
-    list_display = ("table_number", "capacity")
+    list_display = ("table_number", "capacity", "combine_group")
+    list_filter = ("combine_group",)
     search_fields = ("table_number",)
 
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
+    form = BookingAdminForm
     list_display = ("name", "date", "time", "guests", "reference", "table")
-    list_filter = ("date", "time", "table")
-    search_fields = ("name", "email", "phone", "reference")
\ No newline at end of file
+    list_filter = (BookingPeriodFilter, BookingTimeFilter, "table")
+    list_select_related = ("table",)
+    # Read straight off booking_date_time_idx, with no sort step.
+    ordering = ("date", "time", "pk")
+    date_hierarchy = "date"
+    # Every lookup here is served by an index: exact reference, email and
+    # phone, and a name prefix.
+    search_fields = ("reference__iexact", "email__iexact", "phone__exact", "^name")
+    search_help_text = "Exact reference, email or phone, or the start of the name."
+    paginator = EstimatedCountPaginator
+    # Skip the second COUNT(*) over the whole table behind "N total".
+    show_full_result_count = False
+    actions = ["export_csv", "reoptimize_tables"]
+
+    @admin.action(description="Export selected bookings as CSV")
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(
+            csv_lines(export_rows(queryset.order_by("date", "time", "pk"))),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = 'attachment; filename="bookings.csv"'
+        return response
+
+    @admin.action(description="Re-optimize table assignments on the selected bookings' dates")
+    def reoptimize_tables(self, request, queryset):
+        for booking_date in queryset.order_by("date").values_list("date", flat=True).distinct():
+            moved, before, after = reoptimize_date(booking_date)
+            self.message_user(
+                request, f"{booking_date}: moved {moved} booking(s); {after - before} more cover(s) bookable."
+            )
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to_email", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email", "subject")
@@ -0,0 +1,288 @@
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import combinations
+
+from .models import Booking, SlotOccupancy, Table
+from .timeslots import (  # noqa: F401
+    BOOKING_DURATION_MINUTES,
+    BUFFER_MINUTES,
+    SEATING_MINUTES,
+    SLOT_MINUTES,
+    booking_window,
+    service_window,
+)
+
+# Most tables one party may be spread over.
+MAX_JOINED_TABLES = 3
+
+
+class DayAvailability:
+    """
+    Interval index of one day's bookings.
+
+    Tables are kept sorted by capacity and every table holds a sorted list of
+    (start, end) windows, so looking up a free table is a bisect per table
+    instead of a query per table. The contact details of the day's bookings
+    are kept as well, so duplicate checks need no query of their own.
+    ``joined`` holds ``(table_id, time)`` pairs for tables joined to a
+    booking's own table.
+    """
+
+    def __init__(self, booking_date, tables, bookings, joined=()):
+        self.date = booking_date
+        self.tables = sorted(tables, key=lambda table: (table.capacity, table.pk))
+        self.capacities = [table.capacity for table in self.tables]
+        self.windows = {table.pk: [] for table in self.tables}
+        self.groups = defaultdict(list)
+        self.emails = set()
+        self.phones = set()
+
+        for table in self.tables:
+            if table.combine_group:
+                self.groups[table.combine_group].append(table)
+
+        for table_id, booking_time, email, phone in bookings:
+            if table_id in self.windows:
+                self.windows[table_id].append(booking_window(booking_time))
+            if email:
+                self.emails.add(email.lower())
+            if phone:
+                self.phones.add(phone.lower())
+
+        for table_id, booking_time in joined:
+            if table_id in self.windows:
+                self.windows[table_id].append(booking_window(booking_time))
+
+        for windows in self.windows.values():
+            windows.sort()
+
+    @classmethod
+    def load(cls, booking_date, exclude_booking_id=None, lock=False, tables=None):
+        """
+        Build the index for ``booking_date`` with one query per model.
+
+        With ``lock=True`` the table rows are selected for update, which
+        serialises allocations on backends that support row locks. Callers
+        indexing many dates can pass already loaded ``tables`` to skip that
+        query.
+        """
+        if tables is None:
+            tables = Table.objects.only("id", "table_number", "capacity", "combine_group")
+            if lock:
+                tables = tables.select_for_update()
+        tables = list(tables)
+
+        bookings = Booking.objects.filter(date=booking_date)
+        if exclude_booking_id:
+            bookings = bookings.exclude(pk=exclude_booking_id)
+
+        # Only restaurants with combinable tables can have joined ones.
+        joined = ()
+        if any(table.combine_group for table in tables):
+            joined = Booking.joined_tables.through.objects.filter(booking__date=booking_date)
+            if exclude_booking_id:
+                joined = joined.exclude(booking_id=exclude_booking_id)
+            joined = joined.values_list("table_id", "booking__time")
+
+        return cls(
+            booking_date,
+            tables,
+            bookings.values_list("table_id", "time", "email", "phone"),
+            joined,
+        )
+
+    @classmethod
+    def from_ledger(cls, booking_date, tables=None):
+        """
+        Build the index for ``booking_date`` from its SlotOccupancy rows.
+
+        The held slots, joined tables included, come from one lookup on the
+        ledger's (date, slot, table) index; each becomes a window of its own,
+        which is_free and find_seating treat like the bookings' windows. The
+        ledger has no contact details, so has_booking_for is always False:
+        placing a booking uses load().
+        """
+        if tables is None:
+            tables = Table.objects.only("id", "table_number", "capacity", "combine_group")
+        availability = cls(booking_date, tables, ())
+
+        held = SlotOccupancy.objects.filter(date=booking_date).order_by("slot").values_list("table_id", "slot")
+        for table_id, slot in held:
+            if table_id in availability.windows:
+                start = slot.hour * 60 + slot.minute
+                availability.windows[table_id].append((start, start + SLOT_MINUTES))
+
+        return availability
+
+    @property
+    def max_capacity(self):
+        """The largest party one table or one set of joined tables can seat."""
+        largest = self.capacities[-1] if self.capacities else 0
+        for tables in self.groups.values():
+            largest = max(largest, sum(sorted(table.capacity for table in tables)[-MAX_JOINED_TABLES:]))
+        return largest
+
+    def is_free(self, table_id, booking_time):
+        """Return True if ``table_id`` has no booking overlapping ``booking_time``."""
+        start, end = booking_window(booking_time)
+        windows = self.windows.get(table_id, [])
+
+        # Windows starting before our end; only the latest of them can still
+        # be running when we start: windows are slot aligned and differ in
+        # length by at most one slot.
+        index = bisect_left(windows, (end,))
+        return index == 0 or windows[index - 1][1] <= start
+
+    def has_booking_for(self, email=None, phone=None):
+        """Return True if the day already has a booking under ``email`` or ``phone``."""
+        return bool(
+            (email and email.lower() in self.emails)
+            or (phone and phone.lower() in self.phones)
+        )
+
+    def find_table(self, booking_time, guests):
+        """Return the smallest free table seating ``guests`` at ``booking_time``."""
+        first = bisect_left(self.capacities, guests)
+
+        for table in self.tables[first:]:
+            if self.is_free(table.pk, booking_time):
+                return table
+
+        return None
+
+    def _lost_minutes(self, table_id, start, end):
+        """
+        Minutes of ``table_id`` that seating (start, end) would leave unsellable.
+
+        Those are the gaps it leaves before and after itself, up to the
+        neighbouring bookings or the ends of service, that are too short to
+        hold another booking.
+        """
+        windows = self.windows[table_id]
+        index = bisect_left(windows, (start,))
+        service_start, service_end = service_window()
+        before = windows[index - 1][1] if index else service_start
+        after = windows[index][0] if index < len(windows) else service_end
+
+        return sum(gap for gap in (start - before, after - end) if 0 < gap < SEATING_MINUTES)
+
+    def find_seating(self, booking_time, guests):
+        """
+        Return the tables that should seat ``guests`` at ``booking_time``, or None.
+
+        Candidates are every free table big enough and every set of up to
+        MAX_JOINED_TABLES free tables of one combine group that seats the
+        party and needs all its tables. The winner costs the fewest seat
+        minutes the rest of the day can no longer sell: its empty seats for
+        the booking's length plus the too-short gaps it leaves on each table.
+        Ties go to fewer tables, then fewer seats, so a plain table beats an
+        equally good combination. The largest table comes first.
+        """
+        start, end = booking_window(booking_time)
+        lost = {
+            table.pk: table.capacity * self._lost_minutes(table.pk, start, end)
+            for table in self.tables
+            if self.is_free(table.pk, booking_time)
+        }
+        best = None
+        best_cost = None
+
+        def consider(tables):
+            nonlocal best, best_cost
+            seats = sum(table.capacity for table in tables)
+            cost = (
+                sum(lost[table.pk] for table in tables) + (seats - guests) * (end - start),
+                len(tables),
+                seats,
+            )
+            if best_cost is None or cost < best_cost:
+                best, best_cost = tables, cost
+
+        for table in self.tables[bisect_left(self.capacities, guests):]:
+            if table.pk in lost:
+                consider((table,))
+
+        for group in self.groups.values():
+            free = [table for table in group if table.pk in lost]
+            # A party that fits the smallest free table never needs joining.
+            if len(free) < 2 or guests <= free[0].capacity:
+                continue
+
+            for size in range(2, min(MAX_JOINED_TABLES, len(free)) + 1):
+                for tables in combinations(free, size):
+                    seats = sum(table.capacity for table in tables)
+                    # tables are sorted by capacity, so tables[0] is the smallest.
+                    if guests <= seats < guests + tables[0].capacity:
+                        consider(tables)
+
+        if best is None:
+            return None
+        return sorted(best, key=lambda table: (-table.capacity, table.pk))
+
+    def bookable_covers(self):
+        """Covers still for sale: every free gap filled back to back with full tables."""
+        service_start, service_end = service_window()
+        covers = 0
+
+        for table in self.tables:
+            previous = service_start
+            for start, end in self.windows[table.pk] + [(service_end, service_end)]:
+                covers += table.capacity * (max(0, start - previous) // SEATING_MINUTES)
+                previous = max(previous, end)
+
+        return covers
+
+    def add(self, table_id, booking_time, email=None, phone=None):
+        """Record a new booking so later lookups see the table and contact as taken."""
+        windows = self.windows.setdefault(table_id, [])
+        window = booking_window(booking_time)
+        windows.insert(bisect_left(windows, window), window)
+
+        if email:
+            self.emails.add(email.lower())
+        if phone:
+            self.phones.add(phone.lower())
+
+    def seat(self, tables, booking_time, email=None, phone=None):
+        """``add`` a booking seated at several joined tables."""
+        self.add(tables[0].pk, booking_time, email, phone)
+        for table in tables[1:]:
+            self.add(table.pk, booking_time)
+
+
+# Orders plan_seating tries: largest parties first, so they claim the tables
+# and combinations only they can use, and by start time, the left-edge order
+# that colours an interval graph with the fewest tables.
+PLAN_ORDERS = (
+    lambda booking: (-booking.guests, booking.time, booking.pk),
+    lambda booking: (booking.time, -booking.guests, booking.pk),
+)
+
+
+def plan_seating(booking_date, tables, bookings):
+    """
+    Seat ``bookings`` afresh on an empty day, ignoring their current tables.
+
+    Each order of PLAN_ORDERS places the bookings one by one with
+    find_seating; the plan leaving the most bookable covers wins. Returns
+    ``({booking_id: tables}, bookable_covers)``, or None when no order
+    seats every booking.
+    """
+    best = None
+
+    for order in PLAN_ORDERS:
+        availability = DayAvailability(booking_date, tables, [])
+        plan = {}
+
+        for booking in sorted(bookings, key=order):
+            seating = availability.find_seating(booking.time, booking.guests)
+            if seating is None:
+                break
+            availability.seat(seating, booking.time)
+            plan[booking.pk] = seating
+        else:
+            covers = availability.bookable_covers()
+            if best is None or covers > best[1]:
+                best = plan, covers
+
+    return best
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GezanaAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gezana_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,72 @@
+from datetime import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .allocation import DayAvailability
+
+TABLES_VERSION_KEY = "gezana:availability:tables"
+# Per-date caches that every booking write for the date drops.
+DATE_CACHES = ("availability", "service-sheet")
+
+
+def date_cache_key(booking_date, name="availability"):
+    # Table changes affect every date, so they bump a shared version instead
+    # of deleting one entry per date.
+    tables_version = cache.get_or_set(TABLES_VERSION_KEY, 1, None)
+    return f"gezana:{name}:{tables_version}:{booking_date.isoformat()}"
+
+
+def day_availability(booking_date):
+    """Return the cached interval index for ``booking_date``, read from the ledger on a miss."""
+    key = date_cache_key(booking_date)
+    availability = cache.get(key)
+
+    if availability is None:
+        availability = DayAvailability.from_ledger(booking_date)
+        cache.set(key, availability, settings.AVAILABILITY_CACHE_TIMEOUT)
+
+    return availability
+
+
+def invalidate_date(booking_date):
+    """Drop the cached availability and service sheet for a single date."""
+    if booking_date:
+        cache.delete_many([date_cache_key(booking_date, name) for name in DATE_CACHES])
+
+
+def invalidate_tables():
+    """Drop the per-date caches for every date after a table change."""
+    try:
+        cache.incr(TABLES_VERSION_KEY)
+    except ValueError:
+        cache.set(TABLES_VERSION_KEY, 2, None)
+
+
+def availability_grid(booking_date, guests, slots):
+    """
+    Return ``[{"time": "HH:MM", "available": bool}, ...]`` for ``slots``.
+
+    Slots earlier than now on today's date are never available.
+    """
+    availability = day_availability(booking_date)
+    now_local = timezone.localtime(timezone.now())
+    today = now_local.date()
+    grid = []
+
+    for slot in slots:
+        hours, minutes = map(int, slot.split(":"))
+        slot_time = time(hours, minutes)
+        in_past = booking_date < today or (
+            booking_date == today and slot_time <= now_local.time()
+        )
+
+        grid.append(
+            {
+                "time": slot,
+                "available": not in_past and availability.find_seating(slot_time, guests) is not None,
+            }
+        )
+
+    return grid
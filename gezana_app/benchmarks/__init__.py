@@ -0,0 +1,102 @@
+"""
+Benchmarks for the booking and menu hot paths.
+
+Each module exposes ``run(**options)`` returning a list of result rows and is
+executed with ``python manage.py benchmark <name>`` against a throwaway test
+database, so real data is never touched.
+"""
+from statistics import median, quantiles
+from time import perf_counter
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+SUITES = [
+    "allocation",
+    "references",
+    "booking_email",
+    "menu_search",
+    "menu_images",
+    "micro",
+    "load",
+    "async_views",
+    "connections",
+    "seating",
+    "reseating",
+    "static_assets",
+    "pages",
+    "admin",
+    "service_sheet",
+    "edits",
+    "throttle",
+]
+
+# Keys of a result row that are measurements; the rest identify the row.
+METRIC_KEYS = {
+    "queries",
+    "queries_per_request",
+    "connects_per_request",
+    "errors",
+    "rps",
+    "bytes",
+    "parties",
+    "covers",
+    "utilization_pct",
+    "bookings",
+    "moved",
+    "covers_gained",
+    "retries",
+    "us_per_request",
+    "overhead_us",
+}
+
+# Views render static tags; the manifest storage would need collectstatic.
+PLAIN_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def measure(func, repeat=20):
+    """Call ``func`` ``repeat`` times and return its query count and timings in ms."""
+    # Seeding may have filled the bounded query log, which would hide new queries.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append((perf_counter() - start) * 1000)
+
+    return {"queries": len(queries), **summarize(timings)}
+
+
+def summarize(timings):
+    """Return median, p95, p99 and max of ``timings`` (in ms)."""
+    cuts = quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else timings * 99
+    return {
+        "median_ms": round(median(timings), 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def _identity(row):
+    return tuple((key, value) for key, value in row.items() if key not in METRIC_KEYS and not key.endswith("_ms"))
+
+
+def compare(baseline, rows):
+    """
+    Add a ``vs_baseline`` column to ``rows``: the median's change against the
+    matching row of an earlier run, e.g. ``-12.5%``.
+    """
+    previous = {_identity(row): row for row in baseline}
+
+    for row in rows:
+        before = previous.get(_identity(row), {}).get("median_ms")
+        if before and "median_ms" in row:
+            row["vs_baseline"] = f"{(row['median_ms'] - before) / before * 100:+.1f}%"
+    return rows
@@ -0,0 +1,75 @@
+"""
+Load time of the bookings admin changelist, as shipped and with the old
+configuration: every-date and every-time filters, substring search over four
+columns, no date hierarchy, full result counts.
+
+Sizes are booking counts, spread evenly over the days around today, so half
+the calendar is upcoming. Run ``--sizes 1000000`` for the million-row case;
+seeding it takes a few minutes.
+"""
+from datetime import date, timedelta
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from gezana_app.models import Booking
+
+from . import PLAIN_STORAGES, measure
+from .datasets import seed_bookings, seed_tables
+
+DEFAULT_SIZES = (10_000, 100_000)
+TABLES = 50
+PER_DAY = 250
+LEGACY = {
+    "list_filter": ("date", "time", "table"),
+    "list_select_related": False,
+    "ordering": None,
+    "date_hierarchy": None,
+    "search_fields": ("name", "email", "phone", "reference"),
+    "paginator": Paginator,
+    "show_full_result_count": True,
+}
+VIEWS = {
+    "list": {},
+    "search_email": {"q": "seed3-7@example.com"},
+    "search_name": {"q": "Bench"},
+}
+
+
+def _configure(model_admin, settings):
+    for name, value in settings.items():
+        setattr(model_admin, name, value)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+def run(sizes=DEFAULT_SIZES, repeat=10):
+    model_admin = admin.site._registry[Booking]
+    shipped = {name: getattr(model_admin, name) for name in LEGACY}
+    client = Client()
+    client.force_login(User.objects.create_superuser("bench", "bench@example.com", "password"))
+    url = reverse("admin:gezana_app_booking_changelist")
+    rows = []
+
+    try:
+        for size in sizes:
+            days = max(1, size // PER_DAY)
+            seed_bookings(seed_tables(TABLES), PER_DAY, days, start=date.today() - timedelta(days=days // 2))
+
+            for mode, settings in (("legacy", LEGACY), ("high_volume", shipped)):
+                _configure(model_admin, settings)
+                for view, params in VIEWS.items():
+                    rows.append(
+                        {
+                            "bookings": size,
+                            "mode": mode,
+                            "view": view,
+                            **measure(lambda: client.get(url, params), repeat),
+                        }
+                    )
+    finally:
+        _configure(model_admin, shipped)
+
+    return rows
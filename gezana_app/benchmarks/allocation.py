@@ -0,0 +1,55 @@
+"""Compare the interval index with the original per-table query loop."""
+from datetime import date, datetime, time, timedelta
+
+from gezana_app.allocation import BOOKING_DURATION_MINUTES, BUFFER_MINUTES, DayAvailability
+from gezana_app.models import Booking, Table
+
+from . import measure
+from .datasets import SITTINGS, seed_bookings, seed_tables
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+def legacy_find_available_table(booking_date, booking_time, guests, exclude_booking_id=None):
+    """The original allocator: one bookings query per suitable table."""
+    suitable_tables = Table.objects.filter(capacity__gte=guests).order_by("capacity")
+    duration = timedelta(minutes=BOOKING_DURATION_MINUTES + BUFFER_MINUTES)
+    requested_start = datetime.combine(booking_date, booking_time)
+    requested_end = requested_start + duration
+
+    for table in suitable_tables:
+        existing_bookings = Booking.objects.filter(date=booking_date, table=table).only("id", "time")
+        if exclude_booking_id:
+            existing_bookings = existing_bookings.exclude(pk=exclude_booking_id)
+
+        conflict = False
+        for booking in existing_bookings:
+            existing_start = datetime.combine(booking_date, booking.time)
+            if requested_start < existing_start + duration and existing_start < requested_end:
+                conflict = True
+                break
+
+        if not conflict:
+            return table
+
+    return None
+
+
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    booking_date = date.today() + timedelta(days=7)
+    booking_time = time(13, 30)
+    rows = []
+
+    for size in sizes:
+        # Every table is fully booked, so both allocators scan all of them.
+        tables = seed_tables(size)
+        seed_bookings(tables, per_day=size * len(SITTINGS), days=1, start=booking_date)
+
+        for label, allocator in (
+            ("legacy_loop", legacy_find_available_table),
+            ("interval_index", lambda *args: DayAvailability.load(args[0]).find_table(*args[1:])),
+        ):
+            result = measure(lambda: allocator(booking_date, booking_time, 2), repeat=repeat)
+            rows.append({"tables": size, "allocator": label, **result})
+
+    return rows
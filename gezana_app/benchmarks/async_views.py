@@ -0,0 +1,125 @@
+"""
+Requests one worker can overlap under slow I/O: sync views versus async views.
+
+Every database query is slowed by SLOW_QUERY_MS, as on a busy remote
+database. Sizes are the number of requests arriving at once. A sync worker
+(gunicorn's default) answers them one after another; the async views run them
+concurrently on one event loop, each request with its own database thread.
+"""
+import asyncio
+from datetime import date, time, timedelta
+from time import perf_counter, sleep
+
+from asgiref.sync import ThreadSensitiveContext
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path, reverse
+
+from gezana_app.models import Booking, SlotOccupancy, Table
+from gezana_app.references import assign_references
+
+from . import PLAIN_STORAGES, summarize
+
+DEFAULT_SIZES = (1, 10, 50)
+SLOW_QUERY_MS = 20
+
+# ROOT_URLCONF for the async run.
+urlpatterns = [path("", include("gezana_app.urls_async"))]
+
+
+def _slow_query(execute, sql, params, many, context):
+    sleep(SLOW_QUERY_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def _slow_down(sender, connection, **kwargs):
+    connection.execute_wrappers.append(_slow_query)
+
+
+def _seed(count):
+    Booking.objects.all().delete()
+    Table.objects.all().delete()
+    table = Table.objects.create(table_number="A1", capacity=4)
+    bookings = [
+        Booking(
+            name="Benchmark",
+            email=f"async{number}@example.com",
+            guests=2,
+            date=date.today() + timedelta(days=1 + number),
+            time=time(13, 0),
+            table=table,
+        )
+        for number in range(count)
+    ]
+    Booking.objects.bulk_create(assign_references(bookings))
+    SlotOccupancy.objects.bulk_create(SlotOccupancy.rows_for(bookings))
+    return [booking.reference for booking in bookings]
+
+
+def _sync_worker(urls):
+    client = Client()
+    start = perf_counter()
+    latencies = []
+    for url in urls:
+        client.get(url)
+        # Latency as the caller sees it, including time spent queued.
+        latencies.append((perf_counter() - start) * 1000)
+    return perf_counter() - start, latencies
+
+
+async def _async_worker(urls):
+    client = AsyncClient()
+    start = perf_counter()
+
+    async def fetch(url):
+        # What ASGIHandler does per request: a private thread for sync code.
+        async with ThreadSensitiveContext():
+            await client.get(url)
+        return (perf_counter() - start) * 1000
+
+    latencies = await asyncio.gather(*(fetch(url) for url in urls))
+    return perf_counter() - start, list(latencies)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+def run(sizes=DEFAULT_SIZES, repeat=1):
+    references = _seed(max(sizes))
+    rows = []
+
+    connection.ensure_connection()
+    connection.execute_wrappers.append(_slow_query)
+    connection_created.connect(_slow_down)
+
+    try:
+        for size in sizes:
+            urls = [reverse("gezana_app:booking_detail", args=[reference]) for reference in references[:size]]
+
+            for mode in ("sync", "async"):
+                elapsed = 0.0
+                latencies = []
+                for _ in range(repeat):
+                    if mode == "sync":
+                        run_elapsed, run_latencies = _sync_worker(urls)
+                    else:
+                        # A fresh event loop, as under an ASGI server; async_to_sync
+                        # would funnel every database call through this thread.
+                        with override_settings(ROOT_URLCONF=__name__):
+                            run_elapsed, run_latencies = asyncio.run(_async_worker(urls))
+                    elapsed += run_elapsed
+                    latencies += run_latencies
+
+                rows.append(
+                    {
+                        "concurrent": size,
+                        "views": mode,
+                        "slow_query_ms": SLOW_QUERY_MS,
+                        "rps": round(len(latencies) / elapsed, 1),
+                        **summarize(latencies),
+                    }
+                )
+    finally:
+        connection_created.disconnect(_slow_down)
+        connection.execute_wrappers.remove(_slow_query)
+
+    return rows
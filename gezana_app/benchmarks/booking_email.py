@@ -0,0 +1,69 @@
+"""Response time of POST /book/ with the outbox versus sending mail in the request."""
+from datetime import date, timedelta
+from itertools import count
+from time import sleep
+
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from gezana_app.emails import send_queued_emails
+from gezana_app.models import Table
+
+from . import PLAIN_STORAGES, measure
+
+# Sizes are simulated mail relay latencies in milliseconds.
+DEFAULT_SIZES = (50,)
+
+
+class SlowEmailBackend(EmailBackend):
+    """A locmem backend that stalls like a slow SMTP relay."""
+
+    delay_ms = 0
+
+    def send_messages(self, messages):
+        sleep(self.delay_ms / 1000)
+        return super().send_messages(messages)
+
+
+@override_settings(
+    STORAGES=PLAIN_STORAGES,
+    THROTTLE_ENABLED=False,
+    EMAIL_BACKEND="gezana_app.benchmarks.booking_email.SlowEmailBackend",
+)
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    client = Client()
+    url = reverse("gezana_app:make_booking")
+    guests = count()
+    rows = []
+
+    for delay_ms in sizes:
+        SlowEmailBackend.delay_ms = delay_ms
+        # One table per request so every booking in the run succeeds.
+        Table.objects.all().delete()
+        Table.objects.bulk_create(
+            [Table(table_number=f"E{number}", capacity=2) for number in range((repeat + 1) * 2)]
+        )
+
+        def book():
+            number = next(guests)
+            return client.post(
+                url,
+                {
+                    "name": "Benchmark",
+                    "email": f"guest{number}@example.com",
+                    "guests": 2,
+                    "date": (date.today() + timedelta(days=7)).isoformat(),
+                    "time": "13:00",
+                },
+            )
+
+        def book_and_send_inline():
+            book()
+            send_queued_emails()
+
+        for label, request in (("inline_smtp", book_and_send_inline), ("outbox", book)):
+            result = measure(request, repeat=repeat)
+            rows.append({"relay_ms": delay_ms, "mode": label, **result})
+
+    return rows
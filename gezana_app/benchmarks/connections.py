@@ -0,0 +1,108 @@
+"""
+Per-request connection overhead: a new connection per request versus
+persistent connections, with and without health checks.
+
+On SQLite the in-memory test database is copied to a file first, because
+Django never really closes in-memory connections, and every connect is slowed
+by CONNECT_MS to stand in for the TCP and TLS handshake to a hosted
+PostgreSQL. Point DATABASE_URL at PostgreSQL to measure real connects instead.
+"""
+import os
+import sqlite3
+from tempfile import mkstemp
+from time import sleep
+
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from . import PLAIN_STORAGES, measure
+from .async_views import _seed
+
+DEFAULT_SIZES = (100,)
+CONNECT_MS = 10
+
+MODES = (
+    ("none", 0, False),
+    ("persistent", 600, False),
+    ("persistent+health_checks", 600, True),
+)
+
+
+def _slow_connect(sender, connection, **kwargs):
+    sleep(CONNECT_MS / 1000)
+
+
+def _copy_to_file():
+    """Move the in-memory SQLite test database to a file; return its path."""
+    handle, path = mkstemp(suffix=".sqlite3")
+    os.close(handle)
+
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+
+    connection.settings_dict["NAME"] = path
+    connection.close()
+    return path
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    reference = _seed(1)[0]
+    url = reverse("gezana_app:booking_detail", args=[reference])
+    client = Client()
+    rows = []
+
+    settings_dict = connection.settings_dict
+    saved = {key: settings_dict[key] for key in ("NAME", "CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+    simulated = connection.vendor == "sqlite"
+    path = _copy_to_file() if simulated and connection.is_in_memory_db() else None
+    if simulated:
+        connection_created.connect(_slow_connect)
+
+    opened = []
+
+    def count_connect(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    connection_created.connect(count_connect)
+
+    try:
+        for requests in sizes:
+            for label, max_age, health_checks in MODES:
+                settings_dict["CONN_MAX_AGE"] = max_age
+                settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                connection.close()
+
+                def burst():
+                    for _ in range(requests):
+                        # The test client skips the request_started/finished
+                        # connection handling that the real handlers do.
+                        close_old_connections()
+                        client.get(url)
+                        close_old_connections()
+
+                opened.clear()
+                result = measure(burst, repeat=repeat)
+                rows.append(
+                    {
+                        "requests": requests,
+                        "mode": label,
+                        "connect_ms": CONNECT_MS if simulated else "real",
+                        "connects_per_request": round(len(opened) / (requests * (repeat + 1)), 2),
+                        "per_request_ms": round(result["median_ms"] / requests, 3),
+                        **result,
+                    }
+                )
+    finally:
+        connection_created.disconnect(count_connect)
+        connection_created.disconnect(_slow_connect)
+        connection.close()
+        settings_dict.update(saved)
+        if path:
+            os.remove(path)
+
+    return rows
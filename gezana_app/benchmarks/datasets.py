@@ -0,0 +1,92 @@
+"""Synthetic restaurants for the benchmarks: tables, a booking calendar and a menu."""
+import random
+from datetime import date, time, timedelta
+
+from gezana_app.models import Booking, MenuItem, SlotOccupancy, Table
+from gezana_app.references import assign_references
+
+# Back-to-back 90 minute sittings, so bookings on one table never overlap.
+SITTINGS = [time(12, 0), time(13, 30), time(15, 0), time(16, 30), time(18, 0), time(19, 30)]
+WORDS = (
+    "injera teff berbere shiro tibs doro wat kitfo gomen misir lentil chickpea "
+    "beef lamb chicken onion garlic ginger butter spiced stew sauteed fresh "
+    "coffee honey sourdough flatbread cabbage potato carrot pepper tomato"
+).split()
+SYLLABLES = "ka ti mo re sha lu ne ba qi do ze fa gu wi yo".split()
+BATCH_SIZE = 5_000
+
+
+def vocabulary():
+    """The dish words plus ~3k made-up ones, so postings are as sparse as a real menu's."""
+    made_up = {a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES}
+    return WORDS + sorted(made_up)
+
+
+def seed_tables(count):
+    """Replace every table with ``count`` tables of 2 to 8 seats."""
+    Booking.objects.all().delete()
+    Table.objects.all().delete()
+    return Table.objects.bulk_create(
+        [Table(table_number=f"B{number}", capacity=2 + number % 4 * 2) for number in range(count)]
+    )
+
+
+def seed_bookings(tables, per_day, days, start=None):
+    """
+    Book ``per_day`` sittings a day for ``days`` days from ``start``.
+
+    Sittings fill table by table, so ``per_day`` is capped at one booking per
+    table per sitting. Returns the number of bookings created.
+    """
+    start = start or date.today() + timedelta(days=1)
+    slots = [(table, sitting) for sitting in SITTINGS for table in tables][:per_day]
+    created = 0
+    batch = []
+
+    for day in range(days):
+        booking_date = start + timedelta(days=day)
+        for number, (table, sitting) in enumerate(slots):
+            batch.append(
+                Booking(
+                    name="Benchmark",
+                    email=f"seed{day}-{number}@example.com",
+                    guests=2,
+                    date=booking_date,
+                    time=sitting,
+                    table=table,
+                )
+            )
+            if len(batch) >= BATCH_SIZE:
+                created += _insert(batch)
+                batch = []
+
+    if batch:
+        created += _insert(batch)
+    return created
+
+
+def _insert(bookings):
+    """bulk_create ``bookings`` along with their ledger rows."""
+    Booking.objects.bulk_create(assign_references(bookings))
+    SlotOccupancy.objects.bulk_create(SlotOccupancy.rows_for(bookings), batch_size=BATCH_SIZE)
+    return len(bookings)
+
+
+def seed_menu(count, seed=None):
+    """Replace the menu with ``count`` items made of random dish words."""
+    rng = random.Random(count if seed is None else seed)
+    words = vocabulary()
+    MenuItem.objects.all().delete()
+    return MenuItem.objects.bulk_create(
+        [
+            MenuItem(
+                name=" ".join(rng.sample(words, 2)).title(),
+                description=" ".join(rng.choices(words, k=20)),
+                ingredients=", ".join(rng.sample(words, 5)),
+                category=rng.choice(["starter", "main", "side", "dessert", "drink"]),
+                price="10.00",
+            )
+            for _ in range(count)
+        ],
+        batch_size=1000,
+    )
@@ -0,0 +1,118 @@
+"""
+Throughput of concurrent booking edits with optimistic versioning against a
+global lock around every edit.
+
+Sizes are worker threads. Each makes ``repeat`` edits to bookings picked at
+random from a shared pool spread over DAYS dates: load the booking, change
+it and save it through place_booking. Optimistic edits reload and retry on
+BookingChanged; locked edits hold one process-wide lock from load to save,
+which is what serialising edits without versions amounts to. Rows report
+edits per second, latency and how many attempts had to be retried.
+
+Every query waits ROUND_TRIP_MS first, as it does for a database on another
+host. Against a local database each edit is pure CPU, which one process
+cannot run in parallel, so the lock would only be measured against retries;
+what versioning saves is holding a lock while those round trips are in
+flight. The suite needs PostgreSQL (point DATABASE_URL at it): SQLite
+serialises every writer and fails the busy ones, so there is nothing for
+versioning to win there.
+"""
+import random
+import threading
+from time import perf_counter, sleep
+
+from django.db import connection
+
+from gezana_app.models import Booking, BookingChanged, Table
+from gezana_app.services import place_booking
+
+from . import summarize
+from .datasets import SITTINGS, seed_bookings, seed_tables
+
+DEFAULT_SIZES = (1, 4, 8)
+TABLES = 20
+DAYS = 7
+POOL = 40
+ROUND_TRIP_MS = 1.0
+
+
+def _round_trip(execute, sql, params, many, context):
+    sleep(ROUND_TRIP_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def _edit(booking_id, number):
+    with connection.execute_wrapper(_round_trip):
+        booking = Booking.objects.get(pk=booking_id)
+        booking.name = f"Edit {number}"
+        booking.guests = 3 if booking.guests == 2 else 2
+        place_booking(booking)
+
+
+def drive(booking_ids, workers, per_worker, global_lock=None):
+    barrier = threading.Barrier(workers)
+    lock = threading.Lock()
+    timings = []
+    totals = {"retries": 0}
+
+    def worker(index):
+        rng = random.Random(index)
+        local_timings = []
+        retries = 0
+
+        barrier.wait()
+        try:
+            for number in range(per_worker):
+                booking_id = rng.choice(booking_ids)
+                start = perf_counter()
+                while True:
+                    try:
+                        if global_lock:
+                            with global_lock:
+                                _edit(booking_id, number)
+                        else:
+                            _edit(booking_id, number)
+                        break
+                    except BookingChanged:
+                        retries += 1
+                local_timings.append((perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            with lock:
+                timings.extend(local_timings)
+                totals["retries"] += retries
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    return {
+        "edits": len(timings),
+        "retries": totals["retries"],
+        "rps": round(len(timings) / elapsed, 1),
+        **summarize(timings or [0.0]),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat=50):
+    if connection.vendor == "sqlite":
+        raise RuntimeError("the edits suite needs concurrent writers; set DATABASE_URL to a PostgreSQL database")
+
+    # Tables of 4 seats at most, so every booking fits its table either way.
+    tables = seed_tables(TABLES)
+    for table in tables:
+        table.capacity = 4
+    Table.objects.bulk_update(tables, ["capacity"])
+    seed_bookings(tables, per_day=TABLES * len(SITTINGS) // 2, days=DAYS)
+    booking_ids = random.Random(0).sample(list(Booking.objects.values_list("pk", flat=True)), POOL)
+    rows = []
+
+    for workers in sizes:
+        for mode, global_lock in (("optimistic", None), ("global_lock", threading.Lock())):
+            rows.append({"workers": workers, "mode": mode, **drive(booking_ids, workers, repeat, global_lock)})
+
+    return rows
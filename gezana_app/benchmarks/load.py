@@ -0,0 +1,129 @@
+"""
+Threaded load driver for the booking and menu endpoints.
+
+Sizes are concurrency levels: each runs every scenario with that many worker
+threads, each with its own test client and database connection, sending
+``repeat`` requests apiece through the full middleware stack. Against SQLite
+the threads share the in-memory test database; set DATABASE_URL to run the
+same load against PostgreSQL.
+"""
+import threading
+from datetime import date, timedelta
+from itertools import count
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from . import PLAIN_STORAGES, summarize
+from .datasets import SITTINGS, seed_bookings, seed_menu, seed_tables
+
+DEFAULT_SIZES = (1, 4, 8)
+TABLES = 50
+DAYS = 14
+MENU_ITEMS = 1_000
+SEARCHES = ("berbere", "spiced lamb", "chick", "kamore")
+
+_guests = count()
+
+
+def _menu(client, worker, number):
+    return client.get(reverse("gezana_app:menu_list"))
+
+
+def _menu_search(client, worker, number):
+    return client.get(reverse("gezana_app:menu_list"), {"search": SEARCHES[number % len(SEARCHES)]})
+
+
+def _availability(client, worker, number):
+    booking_date = date.today() + timedelta(days=1 + number % DAYS)
+    return client.get(reverse("gezana_app:booking_availability"), {"date": booking_date.isoformat(), "guests": 2})
+
+
+def _book(client, worker, number):
+    booking_date = date.today() + timedelta(days=1 + number % DAYS)
+    return client.post(
+        reverse("gezana_app:make_booking"),
+        {
+            "name": "Load",
+            "email": f"load{next(_guests)}@example.com",
+            "guests": 2,
+            "date": booking_date.isoformat(),
+            "time": SITTINGS[(worker + number) % len(SITTINGS)].strftime("%H:%M"),
+        },
+    )
+
+
+SCENARIOS = {
+    "menu": _menu,
+    "menu_search": _menu_search,
+    "availability": _availability,
+    "book": _book,
+}
+
+
+def drive(scenario, workers, per_worker):
+    """Run ``scenario`` from ``workers`` threads at once and summarise the responses."""
+    barrier = threading.Barrier(workers)
+    lock = threading.Lock()
+    timings = []
+    totals = {"queries": 0, "errors": 0}
+
+    def worker(index):
+        client = Client(raise_request_exception=False)
+        local_timings = []
+        local = {"queries": 0, "errors": 0}
+
+        def count_query(execute, sql, params, many, context):
+            local["queries"] += 1
+            return execute(sql, params, many, context)
+
+        barrier.wait()
+        try:
+            with connection.execute_wrapper(count_query):
+                for number in range(per_worker):
+                    start = perf_counter()
+                    response = scenario(client, index, number)
+                    local_timings.append((perf_counter() - start) * 1000)
+                    if response.status_code >= 500:
+                        local["errors"] += 1
+        finally:
+            connection.close()
+            with lock:
+                timings.extend(local_timings)
+                for key, value in local.items():
+                    totals[key] += value
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    requests = len(timings)
+    return {
+        "requests": requests,
+        "errors": totals["errors"],
+        "rps": round(requests / elapsed, 1),
+        "queries_per_request": round(totals["queries"] / max(requests, 1), 2),
+        **summarize(timings or [0.0]),
+    }
+
+
+@override_settings(STORAGES=PLAIN_STORAGES, THROTTLE_ENABLED=False)
+def run(sizes=DEFAULT_SIZES, repeat=50):
+    tables = seed_tables(TABLES)
+    seed_bookings(tables, per_day=TABLES * len(SITTINGS) // 2, days=DAYS)
+    seed_menu(MENU_ITEMS)
+    rows = []
+
+    for workers in sizes:
+        for name, scenario in SCENARIOS.items():
+            cache.clear()
+            rows.append({"workers": workers, "scenario": name, **drive(scenario, workers, repeat)})
+
+    return rows
@@ -0,0 +1,67 @@
+"""Image bytes a menu page downloads: original uploads versus pre-sized derivatives."""
+import random
+import shutil
+from io import BytesIO
+from tempfile import mkdtemp
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image, ImageFilter
+
+from gezana_app.models import MenuItem
+
+# Sizes are the number of cards on the page.
+DEFAULT_SIZES = (12,)
+PHOTO_SIZE = (2400, 1600)
+
+
+def _photo(seed):
+    """A camera-sized JPEG with enough texture to compress like a real photo."""
+    rng = random.Random(seed)
+    image = Image.effect_noise(PHOTO_SIZE, 40).convert("RGB")
+    tint = Image.new("RGB", PHOTO_SIZE, tuple(rng.randrange(256) for _ in range(3)))
+    image = Image.blend(image, tint, 0.6).filter(ImageFilter.GaussianBlur(1))
+
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _page_bytes(items, key=None, width=None):
+    total = 0
+    for item in items:
+        name = item.image.name if key is None else item.image_variants[key][str(width)]
+        total += default_storage.size(name)
+    return total
+
+
+def run(sizes=DEFAULT_SIZES, repeat=1):
+    media_root = mkdtemp()
+    rows = []
+
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            for cards in sizes:
+                MenuItem.objects.all().delete()
+                items = []
+                for number in range(cards):
+                    item = MenuItem(name=f"Dish {number}", description="Benchmark", category="main", price="10.00")
+                    item.image.save(f"dish-{number}.jpg", ContentFile(_photo(number)), save=False)
+                    item.save()
+                    items.append(item)
+
+                rows.append({"cards": cards, "images": "original", "bytes": _page_bytes(items)})
+                for key in ("jpeg", "webp"):
+                    for width, density in ((400, "1x"), (800, "2x")):
+                        rows.append(
+                            {
+                                "cards": cards,
+                                "images": f"{key}_{width}w ({density})",
+                                "bytes": _page_bytes(items, key, width),
+                            }
+                        )
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    return rows
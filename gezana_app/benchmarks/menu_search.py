@@ -0,0 +1,41 @@
+"""Menu search: the old triple icontains query against the search index."""
+from time import perf_counter
+
+from django.db.models import Q
+
+from gezana_app.models import MenuItem
+from gezana_app.search import get_index, search_menu
+
+from . import measure
+from .datasets import seed_menu
+
+DEFAULT_SIZES = (10_000,)
+QUERIES = ("berbere", "spiced lamb", "chick", "kamore")
+
+
+def legacy_search(query):
+    return list(
+        MenuItem.objects.filter(
+            Q(name__icontains=query) | Q(description__icontains=query) | Q(ingredients__icontains=query)
+        ).values_list("pk", flat=True)
+    )
+
+
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    rows = []
+
+    for size in sizes:
+        seed_menu(size)
+
+        start = perf_counter()
+        get_index()
+        build_ms = round((perf_counter() - start) * 1000, 3)
+
+        for query in QUERIES:
+            for label, search in (("icontains", legacy_search), ("search_index", search_menu)):
+                result = measure(lambda: search(query), repeat=repeat)
+                rows.append({"items": size, "query": query, "engine": label, **result})
+
+        rows.append({"items": size, "query": "-", "engine": "index_build", "median_ms": build_ms})
+
+    return rows
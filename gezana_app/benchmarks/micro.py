@@ -0,0 +1,77 @@
+"""
+Microbenchmarks for the request hot paths on a realistic dataset.
+
+Sizes are table counts. Each size books half the sittings of every table for
+DAYS days and builds a MENU_ITEMS item menu, then times table allocation,
+Booking.save (reference generation included), an uncached menu search page
+and the booking confirmation page.
+"""
+from datetime import date, time, timedelta
+from itertools import count
+
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from gezana_app.allocation import DayAvailability
+from gezana_app.menu_cache import _key
+from gezana_app.models import Booking
+from gezana_app.success_page import success_url
+
+from . import PLAIN_STORAGES, measure
+from .datasets import SITTINGS, seed_bookings, seed_menu, seed_tables
+
+DEFAULT_SIZES = (20, 200)
+DAYS = 14
+MENU_ITEMS = 1_000
+SEARCHES = ("berbere", "spiced lamb", "chick")
+
+
+def _uncached_search(client, url, query):
+    def search():
+        # Drop the cached result list so the search itself is timed; the
+        # search index stays warm, as it is in a long-running worker.
+        cache.delete(_key("list", None, query))
+        client.get(url, {"search": query})
+
+    return search
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+def run(sizes=DEFAULT_SIZES, repeat=50):
+    client = Client()
+    menu_url = reverse("gezana_app:menu_list")
+    guests = count()
+    rows = []
+
+    seed_menu(MENU_ITEMS)
+
+    for size in sizes:
+        tables = seed_tables(size)
+        bookings = seed_bookings(tables, per_day=size * len(SITTINGS) // 2, days=DAYS)
+        booking_date = date.today() + timedelta(days=DAYS // 2)
+        dataset = {"tables": size, "bookings": bookings, "menu_items": MENU_ITEMS}
+
+        confirmation_url = success_url(Booking.objects.order_by("pk").first())
+
+        def save_booking():
+            Booking(
+                name="Benchmark",
+                email=f"micro{next(guests)}@example.com",
+                guests=2,
+                date=booking_date + timedelta(days=DAYS),
+                time=time(20, 0),
+            ).save()
+
+        benchmarks = [
+            ("find_table", lambda: DayAvailability.load(booking_date).find_table(time(18, 0), 4)),
+            ("booking_save", save_booking),
+            ("booking_success", lambda: client.get(confirmation_url)),
+        ]
+        for query in SEARCHES:
+            benchmarks.append((f"menu_list?search={query}", _uncached_search(client, menu_url, query)))
+
+        for label, func in benchmarks:
+            rows.append({**dataset, "benchmark": label, **measure(func, repeat=repeat)})
+
+    return rows
@@ -0,0 +1,53 @@
+"""
+Requests per second for the home, about, contact and menu pages, with and
+without the rendering caches: the cached template loader, the anonymous page
+cache and the menu card fragments. Sizes are concurrency levels, as in the
+load suite.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from . import PLAIN_STORAGES
+from .datasets import seed_menu
+from .load import MENU_ITEMS, drive
+
+DEFAULT_SIZES = (1, 4)
+PAGES = ("home", "about", "contact", "menu_list")
+
+
+def _uncached_templates():
+    templates = [dict(settings.TEMPLATES[0])]
+    templates[0]["OPTIONS"] = {
+        **templates[0]["OPTIONS"],
+        "loaders": [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    }
+    return templates
+
+
+def _get(name):
+    url = reverse(f"gezana_app:{name}")
+    return lambda client, worker, number: client.get(url)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+def run(sizes=DEFAULT_SIZES, repeat=50):
+    seed_menu(MENU_ITEMS)
+    modes = {
+        "uncached": {"TEMPLATES": _uncached_templates(), "PAGE_CACHE_TIMEOUT": 0, "MENU_FRAGMENT_CACHE_TIMEOUT": 0},
+        "cached": {},
+    }
+    rows = []
+
+    for workers in sizes:
+        for page in PAGES:
+            for mode, overrides in modes.items():
+                with override_settings(**overrides):
+                    cache.clear()
+                    rows.append({"workers": workers, "page": page, "mode": mode, **drive(_get(page), workers, repeat)})
+
+    return rows
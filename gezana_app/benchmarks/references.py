@@ -0,0 +1,62 @@
+"""Per-save cost of booking reference generation as the table grows."""
+import random
+import string
+from datetime import date, time, timedelta
+
+from gezana_app.models import Booking
+from gezana_app.references import assign_references
+
+from . import measure
+
+DEFAULT_SIZES = (0, 10_000, 100_000, 1_000_000)
+BATCH_SIZE = 5_000
+
+
+def legacy_generate_reference():
+    """The original generator: probe the table until an unused code turns up."""
+    while True:
+        code = "".join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        if not Booking.objects.filter(reference=code).exists():
+            return code
+
+
+def _booking():
+    return Booking(
+        name="Benchmark",
+        phone="0000000",
+        guests=2,
+        date=date.today() + timedelta(days=7),
+        time=time(13, 0),
+    )
+
+
+def _grow_to(size):
+    """Bulk insert bookings until the table holds ``size`` rows."""
+    missing = size - Booking.objects.count()
+
+    while missing > 0:
+        batch = assign_references([_booking() for _ in range(min(missing, BATCH_SIZE))])
+        Booking.objects.bulk_create(batch)
+        missing -= len(batch)
+
+
+def _legacy_save():
+    booking = _booking()
+    booking.reference = legacy_generate_reference()
+    booking.save()
+
+
+def run(sizes=DEFAULT_SIZES, repeat=200):
+    rows = []
+
+    for size in sizes:
+        _grow_to(size)
+
+        for label, save in (
+            ("legacy_probe", _legacy_save),
+            ("optimistic_insert", lambda: _booking().save()),
+        ):
+            result = measure(save, repeat=repeat)
+            rows.append({"existing": size, "generator": label, **result})
+
+    return rows
@@ -0,0 +1,82 @@
+"""
+Time reoptimize_date on a busy day seated in arrival order.
+
+Sizes are table counts. Each run books the day with the greedy allocator
+from the seating suite's requests, cancels CANCELLED of the bookings at
+random, then reseats the date. Rows report the bookable covers gained and
+the run time; repeats time reseating the already optimal day.
+"""
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from gezana_app.allocation import DayAvailability
+from gezana_app.models import Booking, Table
+from gezana_app.services import reoptimize_date
+
+from . import summarize
+from .datasets import _insert
+from .seating import REQUESTS_PER_TABLE, _layout, _requests
+
+DEFAULT_SIZES = (20, 50)
+CANCELLED = 0.15
+
+
+def _book_day(booking_date, tables, rng):
+    availability = DayAvailability(booking_date, tables, [])
+    bookings = []
+
+    for number, (booking_time, guests) in enumerate(_requests(len(tables) * REQUESTS_PER_TABLE, rng)):
+        table = availability.find_table(booking_time, guests)
+        if table is None:
+            continue
+        availability.add(table.pk, booking_time)
+        bookings.append(
+            Booking(
+                name="Benchmark",
+                email=f"reseat{number}@example.com",
+                guests=guests,
+                date=booking_date,
+                time=booking_time,
+                table=table,
+            )
+        )
+
+    _insert(bookings)
+    return bookings
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5):
+    booking_date = date.today() + timedelta(days=7)
+    rows = []
+
+    for size in sizes:
+        Booking.objects.all().delete()
+        Table.objects.all().delete()
+        tables = Table.objects.bulk_create(_layout(size))
+        rng = random.Random(size)
+        bookings = _book_day(booking_date, tables, rng)
+        cancelled = rng.sample(bookings, round(len(bookings) * CANCELLED))
+        Booking.objects.filter(pk__in=[booking.pk for booking in cancelled]).delete()
+
+        start = perf_counter()
+        moved, before, after = reoptimize_date(booking_date)
+        timings = [(perf_counter() - start) * 1000]
+
+        for _ in range(repeat - 1):
+            start = perf_counter()
+            reoptimize_date(booking_date)
+            timings.append((perf_counter() - start) * 1000)
+
+        rows.append(
+            {
+                "tables": size,
+                "bookings": len(bookings) - len(cancelled),
+                "moved": moved,
+                "covers_gained": after - before,
+                "first_run_ms": round(timings[0], 3),
+                **summarize(timings),
+            }
+        )
+
+    return rows
@@ -0,0 +1,90 @@
+"""
+Seat utilization of the seating optimizer against the greedy smallest-table allocator.
+
+Sizes are table counts, laid out in combine groups of GROUP_SIZE. Every
+simulated day offers REQUESTS_PER_TABLE requests per table in random order,
+with random times and party sizes, to an empty in-memory DayAvailability.
+Rows report the parties and covers seated per day, seat utilization of the
+service, and the time each allocation call took.
+"""
+import random
+from datetime import date, time
+from time import perf_counter
+
+from gezana_app.allocation import DayAvailability
+from gezana_app.models import Table
+from gezana_app.timeslots import SEATING_MINUTES, SLOT_MINUTES, service_window
+
+from . import summarize
+
+DEFAULT_SIZES = (20, 50)
+GROUP_SIZE = 5
+REQUESTS_PER_TABLE = 6
+# Party sizes and how often they ask; one request in ten needs joined tables.
+PARTY_SIZES = (2, 3, 4, 5, 6, 7, 8, 10, 12)
+PARTY_WEIGHTS = (30, 10, 20, 8, 12, 4, 6, 6, 4)
+
+
+def _layout(count):
+    return [
+        Table(pk=number + 1, table_number=f"B{number}", capacity=2 + number % 4 * 2,
+              combine_group=f"G{number // GROUP_SIZE}")
+        for number in range(count)
+    ]
+
+
+def _requests(count, rng):
+    start, end = service_window()
+    last_start = end - SEATING_MINUTES
+    times = [time(minutes // 60, minutes % 60) for minutes in range(start, last_start + 1, SLOT_MINUTES)]
+    return [(rng.choice(times), rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0]) for _ in range(count)]
+
+
+def _greedy(availability, booking_time, guests):
+    table = availability.find_table(booking_time, guests)
+    return [table] if table else None
+
+
+def _optimizer(availability, booking_time, guests):
+    return availability.find_seating(booking_time, guests)
+
+
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    """``repeat`` is the number of simulated days per size."""
+    start, end = service_window()
+    rows = []
+
+    for size in sizes:
+        tables = _layout(size)
+        seat_minutes = sum(table.capacity for table in tables) * (end - start)
+
+        for label, allocate in (("greedy", _greedy), ("optimizer", _optimizer)):
+            rng = random.Random(size)
+            parties = covers = 0
+            timings = []
+
+            for _ in range(repeat):
+                availability = DayAvailability(date.today(), tables, [])
+
+                for booking_time, guests in _requests(size * REQUESTS_PER_TABLE, rng):
+                    began = perf_counter()
+                    seating = allocate(availability, booking_time, guests)
+                    timings.append((perf_counter() - began) * 1000)
+
+                    if seating:
+                        availability.seat(seating, booking_time)
+                        parties += 1
+                        covers += guests
+
+            rows.append(
+                {
+                    "tables": size,
+                    "allocator": label,
+                    "parties": round(parties / repeat, 1),
+                    "covers": round(covers / repeat, 1),
+                    "utilization_pct": round(covers * SEATING_MINUTES / (seat_minutes * repeat) * 100, 1),
+                    **summarize(timings),
+                }
+            )
+
+    return rows
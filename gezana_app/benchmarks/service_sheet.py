@@ -0,0 +1,41 @@
+"""
+Time the service sheet for one busy day, in each format, built from the
+database ("cold": the cache is cleared before every call) and from the cache.
+Sizes are bookings on the day, spread over SITTINGS across enough tables.
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from gezana_app.service_sheet import SHEET_FORMATS, render_sheet
+
+from . import measure
+from .datasets import SITTINGS, seed_bookings, seed_tables
+
+DEFAULT_SIZES = (100, 500)
+
+
+def _cold(booking_date, file_format):
+    def render():
+        cache.clear()
+        render_sheet(booking_date, file_format)
+
+    return render
+
+
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    booking_date = date.today() + timedelta(days=1)
+    rows = []
+
+    for size in sizes:
+        tables = seed_tables(-(-size // len(SITTINGS)))
+        seed_bookings(tables, size, 1, start=booking_date)
+
+        for file_format in SHEET_FORMATS:
+            for label, func in (
+                ("cold", _cold(booking_date, file_format)),
+                ("cached", lambda: render_sheet(booking_date, file_format)),
+            ):
+                rows.append({"bookings": size, "format": file_format, "cache": label, **measure(func, repeat)})
+
+    return rows
@@ -0,0 +1,61 @@
+"""
+Bytes a first visit to the home page transfers, per static files storage.
+
+Each storage gets its own collectstatic run into a throwaway STATIC_ROOT;
+the page and every static file it links to are then fetched through
+WhiteNoise with ``Accept-Encoding: br, gzip``, as a browser would.
+"""
+import re
+import shutil
+from tempfile import mkdtemp
+
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+STORAGES = {
+    "whitenoise": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    "pipeline": "gezana_app.storage.StaticPipelineStorage",
+}
+STATIC_URL_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+def _size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def page_bytes(backend, path="/", ignore_patterns=("admin",)):
+    """
+    Return ``{url: bytes}`` for the page at ``path`` and its static files under ``backend``.
+
+    ``ignore_patterns`` are left out of collectstatic to save time.
+    """
+    static_root = mkdtemp()
+    storages = {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": backend},
+    }
+
+    try:
+        with override_settings(DEBUG=False, STATIC_ROOT=static_root, STORAGES=storages):
+            call_command("collectstatic", interactive=False, verbosity=0, ignore_patterns=list(ignore_patterns))
+
+            client = Client(HTTP_ACCEPT_ENCODING="br, gzip")
+            response = client.get(path)
+            sizes = {path: _size(response)}
+            for url in STATIC_URL_RE.findall(response.content.decode()):
+                sizes[url] = _size(client.get(url))
+            return sizes
+    finally:
+        shutil.rmtree(static_root, ignore_errors=True)
+
+
+def run(sizes=None, repeat=1):
+    rows = []
+    for label, backend in STORAGES.items():
+        page = page_bytes(backend)
+        for url, size in page.items():
+            rows.append({"storage": label, "url": re.sub(r"\.[0-9a-f]{12}\.", ".", url), "bytes": size})
+        rows.append({"storage": label, "url": "total", "bytes": sum(page.values())})
+    return rows
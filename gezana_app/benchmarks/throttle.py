@@ -0,0 +1,69 @@
+"""
+The cost of the booking throttle: a trivial view called bare and behind
+``@throttle``, for a POST that is let through, one that is turned away, and
+a GET, which is never throttled. Sizes are calls per timed batch; the
+``*_ms`` columns are per batch and ``us_per_request`` per call.
+"""
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from gezana_app.throttle import throttle
+
+from . import measure
+
+DEFAULT_SIZES = (1000,)
+ALLOWED_RATES = {"booking": "1000000000/second", "reference": "1000000000/second"}
+EXHAUSTED_RATES = {"booking": "1/day", "reference": "1/day"}
+
+
+def _view(request):
+    return HttpResponse()
+
+
+def _batch(view, request, size):
+    def call():
+        for _ in range(size):
+            view(request)
+
+    return call
+
+
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_CACHE="default", THROTTLE_CLIENT_IP_HEADER="")
+def run(sizes=DEFAULT_SIZES, repeat=20):
+    factory = RequestFactory()
+    # Parse the body once, as the view itself would anyway.
+    post = factory.post("/book/", {"reference": "ABCD1234", "name": "Benchmark"})
+    post.POST
+    get = factory.get("/book/")
+    throttled = throttle("booking", reference_field="reference")(_view)
+    cases = (
+        ("bare", "post", _view, post, ALLOWED_RATES),
+        ("throttled", "post", throttled, post, ALLOWED_RATES),
+        ("throttled", "rejected", throttled, post, EXHAUSTED_RATES),
+        ("throttled", "get", throttled, get, ALLOWED_RATES),
+    )
+    rows = []
+
+    for size in sizes:
+        bare_us = None
+        for view_name, request_kind, view, request, rates in cases:
+            with override_settings(THROTTLE_RATES=rates):
+                cache.clear()
+                result = measure(_batch(view, request, size), repeat)
+
+            us_per_request = round(result["median_ms"] * 1000 / size, 3)
+            if bare_us is None:
+                bare_us = us_per_request
+            rows.append(
+                {
+                    "calls": size,
+                    "view": view_name,
+                    "request": request_kind,
+                    "us_per_request": us_per_request,
+                    "overhead_us": round(us_per_request - bare_us, 3),
+                    **result,
+                }
+            )
+
+    return rows
@@ -0,0 +1,192 @@
+import csv
+import json
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .allocation import DayAvailability
+from .availability import invalidate_date
+from .forms import ImportBookingForm
+from .models import Booking, SlotOccupancy, Table
+from .references import REFERENCE_LENGTH, assign_references
+from .services import choose_tables, lock_date
+
+IMPORT_FIELDS = ["reference", "name", "email", "phone", "guests", "date", "time"]
+EXPORT_FIELDS = ["reference", "name", "email", "phone", "guests", "date", "time", "table__table_number"]
+EXPORT_HEADER = ["reference", "name", "email", "phone", "guests", "date", "time", "table"]
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+
+
+def read_rows(handle, file_format):
+    """Yield ``(line_number, row_dict)`` from a CSV or JSONL file, one row at a time."""
+    if file_format == "jsonl":
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+    else:
+        yield from enumerate(csv.DictReader(handle), start=2)
+
+
+def _validate(row):
+    """
+    Return an unsaved Booking for ``row`` using the BookingForm rules.
+
+    Past dates are accepted, so exported history can be imported again. A
+    reference in the row is kept; rows without one get a new reference.
+    """
+    if not isinstance(row, dict):
+        raise ValidationError("Malformed row.")
+
+    data = {field: str(row.get(field) or "").strip() for field in IMPORT_FIELDS}
+    # Exports write HH:MM, but accept HH:MM:SS from other tools too.
+    data["time"] = data["time"][:5]
+    reference = data["reference"].upper()
+
+    form = ImportBookingForm(data=data)
+    errors = []
+    if not form.is_valid():
+        for field, messages in form.errors.items():
+            prefix = "" if field == "__all__" else f"{field}: "
+            errors.extend(prefix + message for message in messages)
+    if reference and not (reference.isascii() and reference.isalnum() and len(reference) <= REFERENCE_LENGTH):
+        errors.append(f"reference: Use at most {REFERENCE_LENGTH} letters and digits.")
+    if errors:
+        raise ValidationError(errors)
+
+    booking = form.save(commit=False)
+    booking.reference = reference
+    return booking
+
+
+def _write_chunk(chunk, on_reject):
+    """Allocate tables for a chunk of bookings date by date and bulk insert them."""
+    by_date = defaultdict(list)
+    for line_number, booking in chunk:
+        by_date[booking.date].append((line_number, booking))
+
+    accepted = []
+    with transaction.atomic():
+        # A reference already in use means the booking is here already, e.g.
+        # an export imported twice: reject it rather than book it again.
+        taken = set(
+            Booking.objects.filter(
+                reference__in=[booking.reference for _, booking in chunk if booking.reference]
+            ).values_list("reference", flat=True)
+        )
+
+        lock_tables = False
+        for booking_date in sorted(by_date):
+            lock_tables = lock_date(booking_date) or lock_tables
+
+        tables = Table.objects.only("id", "table_number", "capacity", "combine_group")
+        if lock_tables:
+            tables = tables.select_for_update()
+        tables = list(tables)
+
+        for booking_date in sorted(by_date):
+            availability = DayAvailability.load(booking_date, tables=tables)
+
+            for line_number, booking in by_date[booking_date]:
+                if booking.reference in taken:
+                    on_reject(line_number, [f"reference: {booking.reference} is already taken."])
+                    continue
+
+                try:
+                    seating = choose_tables(availability, booking)
+                except ValidationError as exc:
+                    on_reject(line_number, exc.messages)
+                    continue
+
+                booking.seat_at(seating)
+                availability.seat(seating, booking.time, booking.email, booking.phone)
+                accepted.append(booking)
+                if booking.reference:
+                    taken.add(booking.reference)
+
+        Booking.objects.bulk_create(assign_references(accepted))
+        # bulk_create bypasses Booking.save, which keeps the joined tables and the ledger.
+        Joined = Booking.joined_tables.through
+        Joined.objects.bulk_create(
+            Joined(booking_id=booking.pk, table_id=table_id)
+            for booking in accepted
+            for table_id in booking.joined_table_ids
+        )
+        SlotOccupancy.objects.bulk_create(SlotOccupancy.rows_for(accepted))
+
+    # bulk_create sends no post_save signals.
+    for booking_date in by_date:
+        invalidate_date(booking_date)
+
+    return len(accepted)
+
+
+def import_bookings(rows, on_reject, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Validate, allocate and insert bookings from ``(line_number, row)`` pairs.
+
+    Rows are processed in chunks, so memory stays flat however long the input
+    is. Each chunk is one transaction that locks its dates, loads each date's
+    bookings once and writes with ``bulk_create``. Rejected rows are reported
+    through ``on_reject(line_number, messages)``. Returns the number created.
+    """
+    created = 0
+    chunk = []
+
+    for line_number, row in rows:
+        try:
+            chunk.append((line_number, _validate(row)))
+        except ValidationError as exc:
+            on_reject(line_number, exc.messages)
+            continue
+
+        if len(chunk) >= chunk_size:
+            created += _write_chunk(chunk, on_reject)
+            chunk = []
+
+    if chunk:
+        created += _write_chunk(chunk, on_reject)
+
+    return created
+
+
+def export_rows(queryset):
+    """Yield export rows for ``queryset`` without loading it all into memory."""
+    yield EXPORT_HEADER
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        reference, name, email, phone, guests, booking_date, booking_time, table = row
+        yield [
+            reference,
+            name,
+            email or "",
+            phone,
+            guests,
+            booking_date.isoformat(),
+            booking_time.strftime("%H:%M"),
+            table or "",
+        ]
+
+
+class Echo:
+    """File-like object whose write() just returns the value, for streaming CSV."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def jsonl_lines(rows):
+    rows = iter(rows)
+    header = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(header, row))) + "\n"
@@ -0,0 +1,143 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _queue(booking, subject, text_body, html_body):
+    if not booking.email:
+        return None
+
+    return OutboundEmail.objects.create(
+        to_email=booking.email,
+        subject=subject,
+        body=text_body,
+        html_body=html_body,
+    )
+
+
+def queue_booking_confirmation(booking):
+    """Queue the confirmation email for ``booking`` in the current transaction."""
+    subject = "Your Gezana booking is confirmed"
+    text_body = (
+        f"Hi {booking.name},\n\n"
+        f"Your table is booked for {booking.date} at {booking.time}.\n"
+        f"Guests: {booking.guests}\n"
+        f"Reference: {booking.reference}\n\n"
+        "Thank you for choosing Gezana Restaurant."
+    )
+
+    html_body = f"""
+    <div style="font-family: Arial, sans-serif; color: #2d1d16;">
+      <h2 style="color:#8c3c1c;">Gezana Booking Confirmed</h2>
+      <p>Hi {booking.name},</p>
+      <p>Your booking has been confirmed.</p>
+      <ul style="list-style:none; padding:0;">
+        <li><strong>Date:</strong> {booking.date}</li>
+        <li><strong>Time:</strong> {booking.time}</li>
+        <li><strong>Guests:</strong> {booking.guests}</li>
+        <li><strong>Reference:</strong> {booking.reference}</li>
+      </ul>
+      <p>Thank you for choosing Gezana.</p>
+    </div>
+    """
+
+    return _queue(booking, subject, text_body, html_body)
+
+
+def queue_cancellation_confirmation(booking):
+    """Queue the cancellation email for ``booking`` in the current transaction."""
+    subject = "Your Gezana booking has been cancelled"
+    text_body = (
+        f"Hi {booking.name},\n\n"
+        f"Your booking for {booking.date} at {booking.time} has been cancelled.\n"
+        f"Reference: {booking.reference}\n\n"
+        "We hope to welcome you another time.\n\n"
+        "Gezana Restaurant"
+    )
+
+    html_body = f"""
+    <div style="font-family: Arial, sans-serif; color: #2d1d16;">
+      <h2 style="color:#8c3c1c;">Booking Cancelled</h2>
+      <p>Hi {booking.name},</p>
+      <p>Your booking has been cancelled.</p>
+      <ul style="list-style:none; padding:0;">
+        <li><strong>Date:</strong> {booking.date}</li>
+        <li><strong>Time:</strong> {booking.time}</li>
+        <li><strong>Guests:</strong> {booking.guests}</li>
+        <li><strong>Reference:</strong> {booking.reference}</li>
+      </ul>
+      <p>We hope to see you soon.</p>
+    </div>
+    """
+
+    return _queue(booking, subject, text_body, html_body)
+
+
+def _build_message(outbound, connection):
+    message = EmailMultiAlternatives(
+        subject=outbound.subject,
+        body=outbound.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[outbound.to_email],
+        connection=connection,
+    )
+    if outbound.html_body:
+        message.attach_alternative(outbound.html_body, "text/html")
+    return message
+
+
+def send_queued_emails(batch_size=None):
+    """
+    Send one batch of due emails over a single mail connection.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it, so several workers can drain the outbox together.
+    Failed sends are retried with exponential backoff until
+    ``EMAIL_OUTBOX_MAX_ATTEMPTS`` is reached. Returns ``(sent, failed)``.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = failed = 0
+
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+
+        with get_connection() as connection:
+            for outbound in batch:
+                outbound.attempts += 1
+                try:
+                    _build_message(outbound, connection).send()
+                except Exception as exc:
+                    logger.warning("Sending email %s failed: %s", outbound.pk, exc)
+                    failed += 1
+                    outbound.last_error = str(exc)
+                    if outbound.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                        outbound.status = OutboundEmail.FAILED
+                    else:
+                        delay = settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (outbound.attempts - 1)
+                        outbound.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+                else:
+                    sent += 1
+                    outbound.status = OutboundEmail.SENT
+                    outbound.sent_at = timezone.now()
+                    outbound.last_error = ""
+
+        OutboundEmail.objects.bulk_update(
+            batch,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+
+    return sent, failed
@@ -2,20 +2,21 @@ from datetime import date, datetime, time, timedelta
 import re
 
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 from django.utils import timezone
 
-from .models import Booking, Table
-from .utils import find_available_table
+from .models import Booking, SlotOccupancy
+from .timeslots import CLOSE_TIME, OPEN_TIME, occupied_slots
 
 PHONE_REGEX = re.compile(r"^\+?[0-9\s\-\(\)]{7,20}$")
 
 
 class BookingForm(forms.ModelForm):
-    OPEN_TIME = time(12, 0)
-    CLOSE_TIME = time(19, 0)
+    OPEN_TIME = OPEN_TIME
+    CLOSE_TIME = CLOSE_TIME
     LEAD_TIME_MINUTES = 0
+    PAST_ALLOWED = False
 
     TIME_CHOICES = []
     _cur = datetime.combine(date.today(), OPEN_TIME)
@@ -55,12 +56,13 @@ class BookingForm(forms.ModelForm):
         self.fields["date"].widget.input_type = "date"
         self.fields["date"].widget.attrs["min"] = date.today().isoformat()
 
-        if self.instance and self.instance.pk and self.instance.time:
-            self.initial.setdefault("time", self.instance.time.strftime("%H:%M"))
+        # The instance's time comes in as a time object; the choices are "HH:MM".
+        if isinstance(self.initial.get("time"), time):
+            self.initial["time"] = self.initial["time"].strftime("%H:%M")
 
     def clean_date(self):
         booking_date = self.cleaned_data.get("date")
-        if booking_date and booking_date < date.today():
+        if booking_date and booking_date < date.today() and not self.PAST_ALLOWED:
             raise ValidationError(
                 "Date is invalid: you cannot book a date in the past."
             )
@@ -118,6 +120,9 @@ class BookingForm(forms.ModelForm):
                 "Please provide at least an email address or phone number."
             )
 
+        if self.PAST_ALLOWED:
+            return cleaned_data
+
         now_local = timezone.localtime(timezone.now())
         current_timezone = timezone.get_current_timezone()
         requested_dt = timezone.make_aware(
@@ -129,46 +134,123 @@ class BookingForm(forms.ModelForm):
         if booking_date == now_local.date() and requested_dt <= min_allowed:
             raise ValidationError("Please choose a future time for today.")
 
-        if not Table.objects.filter(capacity__gte=guests).exists():
-            raise ValidationError(
-                "No tables can accommodate that party size. Please reduce guests."
-            )
+        return cleaned_data
 
-        exclude_booking_id = (
-            self.instance.pk if self.instance and self.instance.pk else None
-        )
 
-        table = find_available_table(
-            booking_date,
-            booking_time,
-            guests,
-            exclude_booking_id=exclude_booking_id,
-        )
+class ImportBookingForm(BookingForm):
+    """BookingForm for bulk imports, which may bring back bookings already in the past."""
 
-        if table is None:
-            raise ValidationError(
-                "We are fully booked for that date and time. Please choose another slot."
-            )
+    PAST_ALLOWED = True
 
-        duplicate_query = Booking.objects.all()
-        if exclude_booking_id:
-            duplicate_query = duplicate_query.exclude(pk=exclude_booking_id)
 
-        duplicate_filter = Q()
-        if email:
-            duplicate_filter |= Q(date=booking_date, email__iexact=email)
-        if phone:
-            duplicate_filter |= Q(date=booking_date, phone__iexact=phone)
+class EditBookingForm(BookingForm):
+    """
+    BookingForm for changing a saved booking.
 
-        if duplicate_filter and duplicate_query.filter(duplicate_filter).exists():
-            raise ValidationError(
-                "It looks like you already have a booking for that date."
-            )
+    It posts back the booking version and, as hidden initials, the values the
+    guest started from, so an edit saved elsewhere in the meantime can be
+    merged with this one instead of being overwritten (see rebase()).
+    """
+
+    CONFLICT_MESSAGE = "This was changed by someone else while you were editing. Submit again to keep your value."
+
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, conflicts=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.conflicts = conflicts
+        self.initial.setdefault("version", self.instance.version)
+        for field_name in self._meta.fields:
+            self.fields[field_name].show_hidden_initial = True
+
+    def clean(self):
+        for field_name in self.conflicts:
+            self.add_error(field_name, self.CONFLICT_MESSAGE)
+        return super().clean()
+
+    def rebase(self, booking):
+        """
+        Return this edit replayed on ``booking``, a newer copy than the form started from.
+
+        Fields the guest left alone take the saved values, fields they changed
+        keep theirs. A field changed on both sides to different values is an
+        error on the returned form; it starts from the saved booking, so
+        submitting it again keeps the guest's value.
+        """
+        saved = EditBookingForm(instance=booking)
+        data = {"version": booking.version}
+        conflicts = []
+
+        for field_name in self._meta.fields:
+            field = self.fields[field_name]
+            current = saved[field_name].value()
+            started_from = self.data.get(self.add_initial_prefix(field_name))
+            mine = self.data.get(self.add_prefix(field_name))
+
+            if field_name in self.changed_data:
+                if field.has_changed(current, started_from) and field.has_changed(current, mine):
+                    conflicts.append(field_name)
+                data[field_name] = mine
+            else:
+                data[field_name] = current
+            data[self.add_initial_prefix(field_name)] = current
+
+        return EditBookingForm(data, instance=booking, conflicts=conflicts)
+
+
+class BookingAdminForm(forms.ModelForm):
+    """
+    The admin's booking form. A table already held at that time is a form
+    error here rather than a SlotTaken from the ledger on save.
+    """
 
-        self.available_table = table
+    class Meta:
+        model = Booking
+        fields = "__all__"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        table = cleaned_data.get("table")
+        booking_date = cleaned_data.get("date")
+        booking_time = cleaned_data.get("time")
+        if not table or not booking_date or not booking_time:
+            return cleaned_data
+
+        # Saving keeps the booking's joined tables, so they must be free too.
+        tables = [table.pk]
+        if self.instance.pk:
+            tables += self.instance.joined_tables.values_list("pk", flat=True)
+
+        taken = (
+            SlotOccupancy.objects.filter(date=booking_date, slot__in=occupied_slots(booking_time), table__in=tables)
+            .exclude(booking_id=self.instance.pk)
+            .select_related("booking", "table")
+            .order_by("slot")
+            .first()
+        )
+        if taken:
+            self.add_error(
+                "table",
+                f"Table {taken.table.table_number} is already taken at {taken.slot:%H:%M} "
+                f"by booking {taken.booking.reference}.",
+            )
         return cleaned_data
 
 
+class AvailabilityForm(forms.Form):
+    MAX_GUESTS = 20
+
+    date = forms.DateField()
+    guests = forms.IntegerField(min_value=1, max_value=MAX_GUESTS)
+
+    def clean_date(self):
+        booking_date = self.cleaned_data["date"]
+        horizon = settings.BOOKING_HORIZON_DAYS
+        if not date.today() <= booking_date <= date.today() + timedelta(days=horizon):
+            raise ValidationError(f"Choose a date from today up to {horizon} days ahead.")
+        return booking_date
+
+
 class CancelBookingForm(forms.Form):
     reference = forms.CharField(max_length=8)
 
@@ -0,0 +1,93 @@
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (400, 800, 1200)
+# (key in MenuItem.image_variants, file extension, Pillow format, save options)
+DERIVATIVE_FORMATS = (
+    ("webp", "webp", "WEBP", {"quality": 80}),
+    ("jpeg", "jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+)
+
+
+def _encode(image, pillow_format, options):
+    if pillow_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def delete_derivatives(variants, storage):
+    for key, _, _, _ in DERIVATIVE_FORMATS:
+        for name in variants.get(key, {}).values():
+            try:
+                storage.delete(name)
+            except Exception:
+                logger.warning("Could not delete image derivative %s", name)
+
+
+def build_derivatives(image_field):
+    """
+    Write resized WebP and JPEG copies of ``image_field`` next to the original.
+
+    Returns the ``MenuItem.image_variants`` mapping:
+    ``{"source": name, "webp": {"400": name, ...}, "jpeg": {...}}``.
+    Images are never upscaled; a small original just gets one copy per format
+    at its own width.
+    """
+    storage = image_field.storage
+    source = PurePosixPath(image_field.name)
+    variants = {"source": image_field.name}
+
+    with image_field.open("rb") as handle:
+        original = ImageOps.exif_transpose(Image.open(handle))
+        original.load()
+
+    widths = sorted({min(width, original.width) for width in DERIVATIVE_WIDTHS})
+
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS)
+
+        for key, extension, pillow_format, options in DERIVATIVE_FORMATS:
+            name = str(source.parent / "derived" / f"{source.stem}-{width}w.{extension}")
+            saved = storage.save(name, ContentFile(_encode(resized, pillow_format, options)))
+            variants.setdefault(key, {})[str(width)] = saved
+
+    return variants
+
+
+def optimize_image(data, max_width=None):
+    """
+    Re-encode PNG or JPEG ``data`` as small as Pillow can, at most ``max_width`` wide.
+
+    Other formats, and results that come out no smaller, are returned as is.
+    """
+    image = Image.open(BytesIO(data))
+    if image.format not in ("PNG", "JPEG"):
+        return data
+
+    pillow_format = image.format
+    image.load()
+    if max_width and image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.LANCZOS)
+
+    if pillow_format == "JPEG":
+        options = {"quality": 82, "optimize": True, "progressive": True}
+    else:
+        options = {"optimize": True}
+
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, **options)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(data) else data
@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import Booking, SlotOccupancy
+from .timeslots import occupied_slots
+
+LEDGER_BATCH_SIZE = 5000
+
+
+def _bookings(date_from=None, date_to=None):
+    bookings = Booking.objects.filter(table__isnull=False)
+    if date_from:
+        bookings = bookings.filter(date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(date__lte=date_to)
+    return bookings
+
+
+def _joined(date_from=None, date_to=None):
+    """Return ``{booking_id: [joined table ids]}`` for bookings in the date range."""
+    joined = Booking.joined_tables.through.objects.all()
+    if date_from:
+        joined = joined.filter(booking__date__gte=date_from)
+    if date_to:
+        joined = joined.filter(booking__date__lte=date_to)
+
+    tables = defaultdict(list)
+    for booking_id, table_id in joined.values_list("booking_id", "table_id").iterator(chunk_size=LEDGER_BATCH_SIZE):
+        tables[booking_id].append(table_id)
+    return tables
+
+
+def _occupancy(date_from=None, date_to=None):
+    occupancy = SlotOccupancy.objects.all()
+    if date_from:
+        occupancy = occupancy.filter(date__gte=date_from)
+    if date_to:
+        occupancy = occupancy.filter(date__lte=date_to)
+    return occupancy
+
+
+def rebuild_ledger(date_from=None, date_to=None):
+    """
+    Rewrite the ledger rows of every booking in the date range from scratch.
+
+    Bookings whose table, or one of their joined tables, is already held by
+    an earlier booking (by id) for one of their slots cannot be represented
+    and are skipped. Returns
+    ``(rows_written, conflicting_booking_ids)``.
+    """
+    written = 0
+    conflicts = []
+    batch = []
+    taken = set()
+    current_date = None
+    joined = _joined(date_from, date_to)
+
+    bookings = _bookings(date_from, date_to).order_by("date", "pk").values_list("pk", "date", "time", "table_id")
+
+    with transaction.atomic():
+        _occupancy(date_from, date_to).delete()
+
+        for pk, booking_date, booking_time, table_id in bookings.iterator(chunk_size=LEDGER_BATCH_SIZE):
+            if booking_date != current_date:
+                current_date = booking_date
+                taken.clear()
+
+            keys = [
+                (slot, table)
+                for table in [table_id, *joined.get(pk, ())]
+                for slot in occupied_slots(booking_time)
+            ]
+            if any(key in taken for key in keys):
+                conflicts.append(pk)
+                continue
+
+            taken.update(keys)
+            batch.extend(
+                SlotOccupancy(date=booking_date, slot=slot, table_id=table, booking_id=pk) for slot, table in keys
+            )
+            if len(batch) >= LEDGER_BATCH_SIZE:
+                written += len(SlotOccupancy.objects.bulk_create(batch))
+                batch = []
+
+        if batch:
+            written += len(SlotOccupancy.objects.bulk_create(batch))
+
+    return written, conflicts
+
+
+def check_ledger(date_from=None, date_to=None):
+    """
+    Compare the ledger with the bookings in the date range.
+
+    Returns ``(missing, extra)``: sorted ``(booking_id, date, slot, table_id)``
+    rows the bookings call for but the ledger lacks, and ledger rows no
+    booking accounts for.
+    """
+    joined = _joined(date_from, date_to)
+    expected = {
+        (pk, booking_date, slot, table)
+        for pk, booking_date, booking_time, table_id in _bookings(date_from, date_to)
+        .values_list("pk", "date", "time", "table_id")
+        .iterator(chunk_size=LEDGER_BATCH_SIZE)
+        for table in [table_id, *joined.get(pk, ())]
+        for slot in occupied_slots(booking_time)
+    }
+    actual = set(
+        _occupancy(date_from, date_to)
+        .values_list("booking_id", "date", "slot", "table_id")
+        .iterator(chunk_size=LEDGER_BATCH_SIZE)
+    )
+    return sorted(expected - actual), sorted(actual - expected)
@@ -0,0 +1,78 @@
+import json
+import subprocess
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from gezana_app.benchmarks import SUITES, compare
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Run a benchmark suite against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("suite", choices=SUITES)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            help="Dataset sizes to run instead of the suite's defaults.",
+        )
+        parser.add_argument("--output", help="Write the results, with the git commit, to this JSON file.")
+        parser.add_argument("--compare", help="JSON file from an earlier --output run to compare medians against.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as handle:
+                    baseline = json.load(handle)["rows"]
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}") from exc
+
+        suite = import_module(f"gezana_app.benchmarks.{options['suite']}")
+        old_name = connection.settings_dict["NAME"]
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            kwargs = {"repeat": options["repeat"]}
+            if options["sizes"]:
+                kwargs["sizes"] = options["sizes"]
+            rows = suite.run(**kwargs)
+        except Exception as exc:
+            raise CommandError(f"Benchmark failed: {exc}") from exc
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options["output"]:
+            result = {
+                "suite": options["suite"],
+                "commit": _git_commit(),
+                "database": connection.vendor,
+                "created": timezone.now().isoformat(),
+                "repeat": options["repeat"],
+                "rows": rows,
+            }
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(result, handle, indent=2)
+
+        if baseline is not None:
+            rows = compare(baseline, rows)
+
+        for row in rows:
+            self.stdout.write("  ".join(f"{key}={value}" for key, value in row.items()))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from gezana_app.models import MenuItem
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG copies for menu item images that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild even up-to-date derivatives.")
+
+    def handle(self, *args, **options):
+        built = 0
+
+        for item in MenuItem.objects.exclude(image="").exclude(image__isnull=True).iterator():
+            if item.refresh_image_variants(force=options["force"]):
+                built += 1
+                self.stdout.write(f"Built derivatives for {item.name}")
+
+        self.stdout.write(f"Updated {built} menu item(s).")
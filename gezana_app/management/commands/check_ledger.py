@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gezana_app.ledger import check_ledger
+
+SHOW = 20
+
+
+class Command(BaseCommand):
+    help = "Check that the SlotOccupancy ledger matches the bookings; exits non-zero if not."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="First date to check (YYYY-MM-DD).")
+        parser.add_argument("--date-to", help="Last date to check (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        missing, extra = check_ledger(options["date_from"], options["date_to"])
+
+        for label, rows in (("Missing", missing), ("Extra", extra)):
+            for booking_id, booking_date, slot, table_id in rows[:SHOW]:
+                self.stderr.write(f"{label}: booking {booking_id} table {table_id} {booking_date} {slot:%H:%M}")
+            if len(rows) > SHOW:
+                self.stderr.write(f"... and {len(rows) - SHOW} more {label.lower()} row(s)")
+
+        if missing or extra:
+            raise CommandError(
+                f"Ledger is out of step: {len(missing)} missing, {len(extra)} extra row(s). "
+                "Run `python manage.py rebuild_ledger`."
+            )
+        self.stdout.write("Ledger matches the bookings.")
@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gezana_app.booking_io import csv_lines, export_rows, jsonl_lines
+from gezana_app.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Stream bookings to CSV or JSONL without loading them all into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="-", help="Output path, or - for stdout.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument("--date-from", help="First date to export (YYYY-MM-DD).")
+        parser.add_argument("--date-to", help="Last date to export (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        bookings = Booking.objects.order_by("date", "time", "pk")
+        for option, lookup in (("date_from", "date__gte"), ("date_to", "date__lte")):
+            if options[option]:
+                try:
+                    bookings = bookings.filter(**{lookup: date.fromisoformat(options[option])})
+                except ValueError as exc:
+                    raise CommandError(f"Invalid date: {options[option]}") from exc
+
+        encode = jsonl_lines if options["format"] == "jsonl" else csv_lines
+
+        if options["output"] == "-":
+            for line in encode(export_rows(bookings)):
+                self.stdout.write(line, ending="")
+            return
+
+        try:
+            output = open(options["output"], "w", newline="", encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        with output:
+            output.writelines(encode(export_rows(bookings)))
@@ -0,0 +1,58 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gezana_app.booking_io import IMPORT_CHUNK_SIZE, import_bookings, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import bookings from a CSV or JSONL file (reference, name, email, phone, "
+        "guests, date, time), such as one written by export_bookings. Rows are "
+        "validated with the booking form rules, except that past dates are "
+        "allowed; tables are allocated per date and rows are written in chunks "
+        "with bulk_create. References are kept, rows without one get a new one, "
+        "and rows whose reference is already taken are rejected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument("--rejects", help="Write rejected rows as CSV (line, errors) to this path.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+        try:
+            handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+            rejects_file = open(options["rejects"], "w", newline="", encoding="utf-8") if options["rejects"] else None
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        rejects_writer = csv.writer(rejects_file) if rejects_file else None
+        rejected = 0
+
+        def on_reject(line_number, messages):
+            nonlocal rejected
+            rejected += 1
+            if rejects_writer:
+                rejects_writer.writerow([line_number, " ".join(messages)])
+            else:
+                self.stderr.write(f"Line {line_number}: {' '.join(messages)}")
+
+        try:
+            created = import_bookings(
+                read_rows(handle, file_format),
+                on_reject,
+                chunk_size=options["chunk_size"],
+            )
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+            if rejects_file:
+                rejects_file.close()
+
+        self.stdout.write(f"Imported {created} booking(s), rejected {rejected}.")
@@ -0,0 +1,79 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from gezana_app.menu_cache import invalidate_menu
+from gezana_app.models import MenuItem
+
+BOOLEAN_FIELDS = ("is_vegetarian", "is_popular", "is_new", "is_chef_choice")
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import menu items from a CSV file with columns name, description, "
+        "ingredients, category, price, optional is_* flags and an optional image "
+        "path already present on the media storage. Rows without an image use the "
+        "shared placeholder and never touch storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def _build(self, row):
+        item = MenuItem(
+            name=(row.get("name") or "").strip(),
+            description=(row.get("description") or "").strip(),
+            category=(row.get("category") or "").strip(),
+            price=(row.get("price") or "").strip(),
+            image=(row.get("image") or "").strip(),
+        )
+        if row.get("ingredients"):
+            item.ingredients = row["ingredients"].strip()
+        for field in BOOLEAN_FIELDS:
+            setattr(item, field, (row.get(field) or "").strip().lower() in TRUE_VALUES)
+
+        item.full_clean(exclude=["image", "search_vector"])
+        return item
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options["path"], newline="", encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}") from exc
+
+        created = rejected = 0
+        batch = []
+
+        with handle, transaction.atomic():
+            for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                try:
+                    batch.append(self._build(row))
+                except ValidationError as exc:
+                    rejected += 1
+                    self.stderr.write(f"Line {line_number}: {'; '.join(exc.messages)}")
+                    continue
+
+                if len(batch) >= options["batch_size"]:
+                    created += self._flush(batch)
+                    batch = []
+
+            created += self._flush(batch)
+
+        # bulk_create skips MenuItem signals, so refresh the caches by hand.
+        invalidate_menu()
+        self.stdout.write(f"Imported {created} menu item(s), rejected {rejected}.")
+
+    def _flush(self, batch):
+        if not batch:
+            return 0
+
+        items = MenuItem.objects.bulk_create(batch)
+        if connection.vendor == "postgresql":
+            MenuItem.objects.filter(pk__in=[item.pk for item in items]).update(
+                search_vector=MenuItem.SEARCH_VECTOR
+            )
+        return len(items)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from gezana_app.availability import invalidate_tables
+from gezana_app.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SlotOccupancy ledger from the bookings, optionally for a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--date-to", help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        written, conflicts = rebuild_ledger(options["date_from"], options["date_to"])
+
+        # Cached availability was built from the bookings; start afresh.
+        invalidate_tables()
+
+        for pk in conflicts:
+            self.stderr.write(f"Booking {pk} overlaps an earlier booking on its table and was left out.")
+        self.stdout.write(f"Wrote {written} ledger row(s); {len(conflicts)} conflicting booking(s).")
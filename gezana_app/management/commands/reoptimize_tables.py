@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gezana_app.services import reoptimize_date
+
+
+class Command(BaseCommand):
+    help = "Reassign the tables of every booking on a date so the most covers stay bookable."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", required=True, help="Date to reseat (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            booking_date = date.fromisoformat(options["date"])
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {options['date']}") from exc
+
+        moved, before, after = reoptimize_date(booking_date)
+        self.stdout.write(
+            f"Moved {moved} booking(s); {after - before} more cover(s) bookable ({before} before, {after} after)."
+        )
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from gezana_app.emails import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued booking emails from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Emails sent per mail connection.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_queued_emails(options["batch_size"])
+            except Exception as exc:
+                if not options["loop"]:
+                    raise
+                self.stderr.write(f"Outbox batch failed: {exc}")
+                sent = failed = 0
+
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+
+            if not options["loop"]:
+                return
+
+            # Drain a backlog without pausing; only sleep once the outbox is empty.
+            if not sent and not failed:
+                time.sleep(options["interval"])
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gezana_app.service_sheet import SHEET_FORMATS, render_sheet
+
+
+class Command(BaseCommand):
+    help = "Print a date's service sheet: its bookings and the covers per table and slot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Date of service (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--format", choices=SHEET_FORMATS, default="text")
+        parser.add_argument("--output", default="-", help="Output path, or - for stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            booking_date = date.fromisoformat(options["date"]) if options["date"] else timezone.localdate()
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {options['date']}") from exc
+
+        sheet = render_sheet(booking_date, options["format"])
+
+        if options["output"] == "-":
+            self.stdout.write(sheet, ending="")
+            return
+
+        try:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.write(sheet)
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
@@ -0,0 +1,68 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+
+MENU_VERSION_KEY = "gezana:menu:version"
+_MISSING = object()
+
+
+def menu_version():
+    """
+    Return the menu version: the timestamp of the last menu change.
+
+    It doubles as the Last-Modified time of every menu page and is part of
+    every cached menu key, so bumping it invalidates them all at once.
+    """
+    return cache.get_or_set(MENU_VERSION_KEY, time.time(), None)
+
+
+async def amenu_version():
+    return await cache.aget_or_set(MENU_VERSION_KEY, time.time(), None)
+
+
+def invalidate_menu():
+    cache.set(MENU_VERSION_KEY, time.time(), None)
+
+
+def _digest(parts):
+    return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _key(*parts):
+    return f"gezana:menu:{menu_version()}:{_digest(parts)}"
+
+
+def cached_menu(parts, loader):
+    """Return ``loader()`` cached under ``parts`` for the current menu version."""
+    return cache.get_or_set(_key(*parts), loader, settings.MENU_CACHE_TIMEOUT)
+
+
+async def acached_menu(parts, loader):
+    """Async ``cached_menu``: ``loader`` is a coroutine function."""
+    key = f"gezana:menu:{await amenu_version()}:{_digest(parts)}"
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await loader()
+        await cache.aadd(key, value, settings.MENU_CACHE_TIMEOUT)
+    return value
+
+
+def menu_etag(request, *args, **kwargs):
+    # Pending flash messages are rendered into the page, so such responses
+    # must not be answered with a 304.
+    if len(get_messages(request)):
+        return None
+    # The page also depends on the deployed templates and static files.
+    build = (settings.BUILD_ID, getattr(staticfiles_storage, "manifest_hash", ""))
+    return _key(request.get_full_path(), build)
+
+
+def menu_last_modified(request, *args, **kwargs):
+    if len(get_messages(request)):
+        return None
+    return datetime.fromtimestamp(menu_version(), tz=timezone.utc)
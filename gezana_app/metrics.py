@@ -0,0 +1,160 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+# Upper bounds of the histogram buckets; +Inf is implied.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name -> (help text, buckets)
+HISTOGRAMS = {
+    "gezana_request_duration_seconds": ("Wall time of each request.", SECONDS_BUCKETS),
+    "gezana_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "gezana_db_duration_seconds": ("Time spent in database queries per request.", SECONDS_BUCKETS),
+    "gezana_template_duration_seconds": ("Time spent rendering templates per request.", SECONDS_BUCKETS),
+}
+
+# name -> help text
+COUNTERS = {
+    "gezana_db_connections_opened_total": "Database connections opened while handling requests.",
+}
+
+current_request = ContextVar("gezana_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings collected while one request is being handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.connections_opened = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Per-process histograms keyed by metric name and URL name.
+
+    Each worker process keeps its own registry; Prometheus sums the series
+    when several workers are scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(dict)
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def observe(self, name, view, value):
+        with self._lock:
+            histogram = self._histograms[name].get(view)
+            if histogram is None:
+                histogram = self._histograms[name][view] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def increment(self, name, view, value=1):
+        with self._lock:
+            self._counters[name][view] += value
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """Return every histogram in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for view, histogram in sorted(self._histograms[name].items()):
+                    label = f'view="{_escape(view)}"'
+                    cumulative = 0
+                    for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+            for name, help_text in COUNTERS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for view, value in sorted(self._counters[name].items()):
+                    lines.append(f'{name}{{view="{_escape(view)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+_template_timer_installed = False
+
+
+def install_template_timer():
+    """
+    Time top-level template renders for the request being measured.
+
+    Django only signals template renders under the test runner, so the
+    backend's ``Template.render`` is wrapped instead. Included templates are
+    part of their parent's render and are not counted twice.
+    """
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, *args, **kwargs):
+        metrics = current_request.get()
+        if metrics is None:
+            return original_render(self, *args, **kwargs)
+
+        start = perf_counter()
+        try:
+            return original_render(self, *args, **kwargs)
+        finally:
+            metrics.template_seconds += perf_counter() - start
+
+    Template.render = render
+    _template_timer_installed = True
+
+
+def _count_connection(sender, connection, **kwargs):
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.connections_opened += 1
+
+
+def install_connection_counter():
+    """Count the database connections each measured request has to open."""
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_count_connection, dispatch_uid="gezana_count_connection")
@@ -0,0 +1,70 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestMetrics, current_request, install_connection_counter, install_template_timer, registry
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationMiddleware:
+    """
+    Measure wall time, database queries, new database connections and
+    template rendering per view.
+
+    Enabled with the INSTRUMENTATION setting. Results go out as a
+    ``Server-Timing`` header, into the histograms served by the metrics view,
+    and a warning is logged when a request runs more than
+    INSTRUMENTATION_QUERY_BUDGET queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timer()
+        install_connection_counter()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        start = perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        total = perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+
+        registry.observe("gezana_request_duration_seconds", view, total)
+        registry.observe("gezana_db_queries", view, metrics.queries)
+        registry.observe("gezana_db_duration_seconds", view, metrics.db_seconds)
+        registry.observe("gezana_template_duration_seconds", view, metrics.template_seconds)
+        registry.increment("gezana_db_connections_opened_total", view, metrics.connections_opened)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+            f'conn;desc="{metrics.connections_opened} opened"',
+            f"tpl;dur={metrics.template_seconds * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+        budget = settings.INSTRUMENTATION_QUERY_BUDGET
+        if metrics.queries > budget:
+            logger.warning(
+                "%s %s (%s) ran %d queries, over the budget of %d",
+                request.method,
+                request.path,
+                view,
+                metrics.queries,
+                budget,
+            )
+
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.26 on 2026-10-17 13:29
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gezana_app', '0006_alter_booking_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date', 'table'], name='booking_date_table_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(models.F('date'), django.db.models.functions.text.Upper('email'), name='booking_date_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date', 'phone'], name='booking_date_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='booking_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('reference'), name='booking_reference_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.26 on 2026-10-17 13:33
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """Add the GIN index and fill the vectors; PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX menuitem_search_vector_gin ON gezana_app_menuitem USING gin (search_vector)"
+    )
+    MenuItem = apps.get_model("gezana_app", "MenuItem")
+    MenuItem.objects.update(
+        search_vector=SearchVector("name", weight="A", config="simple")
+        + SearchVector("ingredients", weight="B", config="simple")
+        + SearchVector("description", weight="C", config="simple")
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS menuitem_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gezana_app', '0008_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+from django.core.files.storage import default_storage
+from django.db import migrations
+
+# MenuItem.save used to upload its own copy of the placeholder for every item
+# without an image (no_image_available.png, no_image_available_a1B2c3.png, ...).
+PLACEHOLDER_REGEX = r"^menu_images/no_image_available[^/]*$"
+
+
+def collapse_placeholder_images(apps, schema_editor):
+    """Point placeholder items back at the shared static image and drop the copies."""
+    MenuItem = apps.get_model("gezana_app", "MenuItem")
+    items = MenuItem.objects.filter(image__regex=PLACEHOLDER_REGEX)
+    names = set(items.values_list("image", flat=True))
+
+    items.update(image="")
+
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            # A copy that is already gone or unreachable is not worth failing
+            # the deploy over; the rows no longer reference it either way.
+            pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gezana_app", "0009_menuitem_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_placeholder_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.26 on 2026-10-17 13:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from gezana_app.timeslots import occupied_slots
+
+
+def fill_ledger(apps, schema_editor):
+    """Occupy the slots of existing bookings; overlapping ones are left to check_ledger."""
+    Booking = apps.get_model("gezana_app", "Booking")
+    SlotOccupancy = apps.get_model("gezana_app", "SlotOccupancy")
+    rows = []
+    taken = set()
+
+    bookings = Booking.objects.filter(table__isnull=False).order_by("date", "pk")
+    for pk, booking_date, booking_time, table_id in bookings.values_list("pk", "date", "time", "table_id").iterator():
+        keys = [(booking_date, slot, table_id) for slot in occupied_slots(booking_time)]
+        if taken.isdisjoint(keys):
+            taken.update(keys)
+            rows.extend(
+                SlotOccupancy(date=booking_date, slot=slot, table_id=table_id, booking_id=pk)
+                for _, slot, _ in keys
+            )
+
+    SlotOccupancy.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gezana_app', '0011_menuitem_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.TimeField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='gezana_app.booking')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='gezana_app.table')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='slotoccupancy',
+            constraint=models.UniqueConstraint(fields=('date', 'slot', 'table'), name='slot_occupancy_unique'),
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.26 on 2026-10-17 13:55
+
+from django.db import migrations, models
+
+# The seeded tables of 0005: the four- and six-seaters stand in the main room
+# and the two-seaters by the window.
+DEFAULT_GROUPS = {"T1": "window", "T2": "window", "T3": "main", "T4": "main", "T5": "main", "T6": "main"}
+
+
+def group_default_tables(apps, schema_editor):
+    Table = apps.get_model("gezana_app", "Table")
+    for number, group in DEFAULT_GROUPS.items():
+        Table.objects.filter(table_number=number, combine_group="").update(combine_group=group)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gezana_app', '0012_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='joined_tables',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='joined_bookings', to='gezana_app.table'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='combine_group',
+            field=models.CharField(blank=True, help_text='Tables sharing a group stand together and can be joined for a large party.', max_length=20),
+        ),
+        migrations.RunPython(group_default_tables, migrations.RunPython.noop),
+    ]
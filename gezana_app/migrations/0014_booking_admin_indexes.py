@@ -0,0 +1,37 @@
+# Generated by Django 4.2.26 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+def create_name_prefix_index(apps, schema_editor):
+    """Serve the admin's UPPER(name) LIKE 'X%' searches; PostgreSQL only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX booking_name_upper_prefix_idx ON gezana_app_booking (UPPER(name) varchar_pattern_ops)"
+    )
+
+
+def drop_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS booking_name_upper_prefix_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gezana_app', '0013_table_combine_group_booking_joined_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date', 'time'], name='booking_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['phone'], name='booking_phone_idx'),
+        ),
+        migrations.RunPython(create_name_prefix_index, drop_name_prefix_index),
+    ]
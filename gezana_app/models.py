@@ -1,8 +1,18 @@
-from django.core.files import File
-from pathlib import Path
-from django.db import models
-import random
-import string
+import logging
+
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import DatabaseError, IntegrityError, connections, models, router, transaction
+from django.db.models import F
+from django.db.models.functions import Upper
+from django.templatetags.static import static
+from django.utils import timezone
+
+from .images import build_derivatives, delete_derivatives
+from .menu_cache import invalidate_menu
+from .references import REFERENCE_ATTEMPTS, generate_reference
+from .timeslots import occupied_slots
+
+logger = logging.getLogger(__name__)
 
 
 class MenuCategory(models.TextChoices):
@@ -37,18 +47,55 @@ class MenuItem(models.Model):
     is_chef_choice = models.BooleanField(default=False)
 
     image = models.ImageField(upload_to="menu_images/", blank=True, null=True)
+    # Resized copies of ``image`` written by images.build_derivatives().
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
-    def save(self, *args, **kwargs):
-        # Auto-assign a default placeholder image if none uploaded.
-        if not self.image:
-            placeholder_path = (
-                Path(__file__).resolve().parent / "static" / "images" / "no_image_available.png"
-            )
-            if placeholder_path.exists():
-                with open(placeholder_path, "rb") as f:
-                    self.image.save("no_image_available.png", File(f), save=False)
+    # Maintained on PostgreSQL only (GIN-indexed by migration 0009); other
+    # databases use the in-process index in search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    SEARCH_VECTOR = (
+        SearchVector("name", weight="A", config="simple")
+        + SearchVector("ingredients", weight="B", config="simple")
+        + SearchVector("description", weight="C", config="simple")
+    )
+
+    PLACEHOLDER_IMAGE = "images/no_image_available.png"
 
+    @property
+    def image_url(self):
+        """URL of the uploaded image, or the shared static placeholder."""
+        if self.image:
+            return self.image.url
+        return static(self.PLACEHOLDER_IMAGE)
+
+    def refresh_image_variants(self, force=False):
+        """Rebuild the resized copies if the image changed since they were made."""
+        source = self.image.name if self.image else None
+        if not force and self.image_variants.get("source") == source:
+            return False
+
+        old_variants = self.image_variants
+        try:
+            self.image_variants = build_derivatives(self.image) if self.image else {}
+        except OSError as exc:
+            # Keep serving the original rather than failing the save.
+            logger.warning("Could not build derivatives for %s: %s", source, exc)
+            return False
+
+        MenuItem.objects.filter(pk=self.pk).update(image_variants=self.image_variants)
+        delete_derivatives(old_variants, self.image.storage)
+        # update() sends no signals, and pages cached since the save lack the copies.
+        transaction.on_commit(invalidate_menu)
+        return True
+
+    def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
+        self.refresh_image_variants()
+
+        using = kwargs.get("using") or router.db_for_write(MenuItem, instance=self)
+        if connections[using].vendor == "postgresql":
+            MenuItem.objects.using(using).filter(pk=self.pk).update(search_vector=self.SEARCH_VECTOR)
 
     def __str__(self):
         return self.name
@@ -57,6 +104,11 @@ class MenuItem(models.Model):
 class Table(models.Model):
     table_number = models.CharField(max_length=10, unique=True)
     capacity = models.PositiveIntegerField()
+    combine_group = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Tables sharing a group stand together and can be joined for a large party.",
+    )
 
     def __str__(self):
         return f"Table {self.table_number} ({self.capacity} seats)"
@@ -74,18 +126,230 @@ class Booking(models.Model):
     time = models.TimeField()
     table = models.ForeignKey(Table, on_delete=models.SET_NULL, null=True, blank=True)
     reference = models.CharField(max_length=8, unique=True, blank=True)
+    # Tables pushed together with ``table`` for a large party; set through
+    # seat_at() so the ledger is kept in step.
+    joined_tables = models.ManyToManyField(Table, blank=True, editable=False, related_name="joined_bookings")
+    # Bumped by every save; updates only apply to the version they were loaded at.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        indexes = [
+            # Day loads for allocation and availability, per-table lookups.
+            models.Index(fields=["date", "table"], name="booking_date_table_idx"),
+            # Same-day duplicate checks; iexact compiles to UPPER() on PostgreSQL.
+            models.Index(F("date"), Upper("email"), name="booking_date_email_upper_idx"),
+            models.Index(fields=["date", "phone"], name="booking_date_phone_idx"),
+            models.Index(Upper("email"), name="booking_email_upper_idx"),
+            models.Index(Upper("reference"), name="booking_reference_upper_idx"),
+            # Admin changelist order and phone search; the name prefix index
+            # needs an operator class and is created on PostgreSQL only (0014).
+            models.Index(fields=["date", "time"], name="booking_date_time_idx"),
+            models.Index(fields=["phone"], name="booking_phone_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored date so moving a booking can invalidate both days.
+        instance._loaded_date = instance.__dict__.get("date")
+        instance._loaded_slot = (
+            instance._loaded_date,
+            instance.__dict__.get("time"),
+            instance.__dict__.get("table_id"),
+        )
+        return instance
+
+    def seat_at(self, tables):
+        """Seat the booking at ``tables``: the first becomes ``table``, the rest are joined to it."""
+        self.table = tables[0] if tables else None
+        self.joined_table_ids = [table.pk for table in tables[1:]]
+        self._joined_changed = True
+
+    def _occupancy_changed(self, update_fields):
+        if update_fields is not None and not {"date", "time", "table", "table_id"} & set(update_fields):
+            return False
+        if getattr(self, "_joined_changed", False):
+            return True
+        if self._state.adding:
+            return self.table_id is not None
+        return getattr(self, "_loaded_slot", None) != (self.date, self.time, self.table_id)
+
+    def _sync_joined_tables(self, using, adding):
+        joined = getattr(self, "joined_table_ids", None)
+        through = Booking.joined_tables.through.objects.using(using)
+
+        if getattr(self, "_joined_changed", False):
+            if not adding:
+                through.filter(booking_id=self.pk).delete()
+            through.bulk_create([through.model(booking_id=self.pk, table_id=table_id) for table_id in joined])
+        elif adding:
+            joined = []
+        elif joined is None:
+            joined = list(through.filter(booking_id=self.pk).values_list("table_id", flat=True))
+
+        self.joined_table_ids = joined
+
+    def _sync_occupancy(self, using, adding):
+        self._sync_joined_tables(using, adding)
+
+        occupancy = SlotOccupancy.objects.using(using)
+        loaded = getattr(self, "_loaded_slot", None)
+        if not adding and (loaded is None or loaded[2] is not None):
+            occupancy.filter(booking=self).delete()
+        try:
+            occupancy.bulk_create(SlotOccupancy.rows_for([self]))
+        except IntegrityError as exc:
+            raise SlotTaken(f"Table {self.table_id} is already taken on {self.date} at {self.time}.") from exc
+        self._loaded_slot = (self.date, self.time, self.table_id)
+        self._joined_changed = False
 
     def save(self, *args, **kwargs):
-        if not self.reference:
-            self.reference = self._generate_reference()
-        super().save(*args, **kwargs)
+        # Optimistic concurrency: the row is updated only if it is still at
+        # the version this copy was loaded at (see _do_update), so a stale
+        # copy raises BookingChanged instead of overwriting a newer edit.
+        updating = not self._state.adding
+        if updating:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+
+        try:
+            self._save_with_ledger(*args, **kwargs)
+        except Exception:
+            if updating:
+                self.version -= 1
+            raise
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if self._state.adding:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+        # UPDATE ... WHERE id = %s AND version = <loaded version>
+        updated = super()._do_update(
+            base_qs.filter(version=self.version - 1), using, pk_val, values, update_fields, forced_update
+        )
+        if not updated:
+            raise BookingChanged(f"Booking {pk_val} was changed or cancelled since it was loaded.")
+        return updated
 
-    def _generate_reference(self):
-        """Return a unique 8-character reference code."""
-        while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            if not Booking.objects.filter(reference=code).exists():
-                return code
+    def _save_with_ledger(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(Booking, instance=self)
+
+        if not self._occupancy_changed(kwargs.get("update_fields")):
+            self._save_row(using, *args, **kwargs)
+            return
+
+        # The booking row and its ledger slots are written together; the
+        # ledger's unique constraint is what finally rules out double booking.
+        adding = self._state.adding
+        try:
+            with transaction.atomic(using=using, savepoint=False):
+                self._save_row(using, *args, **kwargs)
+                self._sync_occupancy(using, adding)
+        except IntegrityError:
+            if adding:
+                self.pk = None
+                self._state.adding = True
+            raise
+
+    def _save_row(self, alias, *args, **kwargs):
+        if self.reference:
+            super().save(*args, **kwargs)
+            return
+
+        # Insert optimistically and let the unique constraint catch the rare
+        # collision, instead of querying for every new reference first.
+        for attempt in range(REFERENCE_ATTEMPTS):
+            self.reference = generate_reference()
+            try:
+                super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                self.reference = ""
+                # Inside a transaction the failed insert may have aborted it,
+                # so the transaction's owner has to retry (see place_booking).
+                if connections[alias].in_atomic_block or attempt == REFERENCE_ATTEMPTS - 1:
+                    raise
 
     def __str__(self):
         return f"{self.name} — {self.date} {self.time} ({self.guests} guests)"
+
+
+class SlotTaken(IntegrityError):
+    """A booking's table is already held for one of its slots in the ledger."""
+
+
+class BookingChanged(DatabaseError):
+    """The booking was saved or deleted by someone else since this copy was loaded."""
+
+
+class SlotOccupancy(models.Model):
+    """
+    One ledger slot of a table held by a booking.
+
+    Booking.save writes a row per SLOT_MINUTES slot of the booking window and
+    deleting the booking cascades to them, so the unique constraint rejects
+    any double booking. The availability grid reads a date's free tables from
+    it with DayAvailability.from_ledger.
+    """
+
+    date = models.DateField()
+    slot = models.TimeField()
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="+")
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="occupancy")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "slot", "table"], name="slot_occupancy_unique"),
+        ]
+
+    @classmethod
+    def rows_for(cls, bookings):
+        """
+        Return unsaved ledger rows for ``bookings`` that have a table.
+
+        Joined tables come from ``Booking.joined_table_ids`` as set by
+        seat_at() or the last save, so this never queries.
+        """
+        return [
+            cls(date=booking.date, slot=slot, table_id=table_id, booking=booking)
+            for booking in bookings
+            if booking.table_id is not None
+            for table_id in [booking.table_id, *(getattr(booking, "joined_table_ids", None) or ())]
+            for slot in occupied_slots(booking.time)
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.slot} table {self.table_id} → booking {self.booking_id}"
+
+
+class OutboundEmail(models.Model):
+    """A queued email, written with the booking change and sent by a worker."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbound_email_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email} ({self.status})"
@@ -0,0 +1,60 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PAGE_CACHE_PREFIX = "gezana:page"
+
+
+def _key(request):
+    # The path alone: one entry per page, whatever host or query string the
+    # visitor sent, so made-up URLs cannot fill the shared cache.
+    return f"{PAGE_CACHE_PREFIX}:{hashlib.md5(request.path.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def _cacheable(request):
+    if request.method not in ("GET", "HEAD") or not settings.PAGE_CACHE_TIMEOUT:
+        return False
+    # These pages take no parameters; a query string is rendered, not stored.
+    if request.GET:
+        return False
+    # Flash messages and the admin bar are per visitor; such pages are
+    # rendered afresh and never stored.
+    return not len(get_messages(request)) and not request.user.is_authenticated
+
+
+def cache_anonymous_page(view):
+    """
+    Serve ``view`` from the cache to anonymous visitors with no pending messages.
+
+    Only pages that are the same for every such visitor qualify: a render
+    that touched the CSRF token or set a cookie is not stored. Entries live
+    for ``PAGE_CACHE_TIMEOUT`` seconds, so a deploy's template changes show
+    up within that time even with a shared cache.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = _key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            cache.set(key, (response.content, response["Content-Type"]), settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
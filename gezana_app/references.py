@@ -0,0 +1,53 @@
+import secrets
+import string
+
+REFERENCE_ALPHABET = string.ascii_uppercase + string.digits
+REFERENCE_LENGTH = 8
+REFERENCE_ATTEMPTS = 5
+
+
+def generate_reference():
+    """
+    Return a random 8-character ``[A-Z0-9]`` booking reference.
+
+    Uses ``secrets`` so references cannot be predicted from earlier ones.
+    With 36^8 (about 2.8 trillion) codes a collision is vanishingly rare, so
+    callers insert optimistically and only retry on the unique constraint
+    instead of checking for the code first.
+    """
+    return "".join(secrets.choice(REFERENCE_ALPHABET) for _ in range(REFERENCE_LENGTH))
+
+
+def assign_references(bookings):
+    """
+    Give every booking in ``bookings`` without a reference a distinct new one.
+
+    Meant for imports ahead of ``bulk_create``: codes are unique within the
+    batch and checked against existing rows with a single query per batch.
+    """
+    from .models import Booking
+
+    pending = [booking for booking in bookings if not booking.reference]
+    used = {booking.reference for booking in bookings if booking.reference}
+
+    while pending:
+        codes = set()
+        while len(codes) < len(pending):
+            code = generate_reference()
+            if code not in used:
+                codes.add(code)
+
+        used |= set(
+            Booking.objects.filter(reference__in=codes).values_list("reference", flat=True)
+        )
+
+        unassigned = []
+        for booking, code in zip(pending, codes):
+            if code in used:
+                unassigned.append(booking)
+            else:
+                booking.reference = code
+                used.add(code)
+        pending = unassigned
+
+    return bookings
@@ -0,0 +1,154 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from .menu_cache import menu_version
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Relative weight of a match in each field; mirrors the A/B/C weights of
+# MenuItem.SEARCH_VECTOR on PostgreSQL.
+FIELD_WEIGHTS = {"name": 3.0, "ingredients": 2.0, "description": 1.0}
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text):
+    """Split ``text`` into lowercase word tokens."""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class MenuSearchIndex:
+    """
+    In-process inverted index over menu item names, descriptions and ingredients.
+
+    Postings map each token to ``{item_id: score}``; a sorted vocabulary makes
+    prefix matching a bisect. Every query token must match (exactly or as a
+    prefix) for an item to be returned, and results are ranked by score.
+    """
+
+    def __init__(self, items=()):
+        self.postings = defaultdict(dict)
+        self.item_tokens = {}
+        self.vocabulary = []
+        self._dirty = False
+
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        self.remove(item.pk)
+        scores = defaultdict(float)
+
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(item, field)):
+                scores[token] += weight
+
+        for token, score in scores.items():
+            self.postings[token][item.pk] = score
+
+        self.item_tokens[item.pk] = set(scores)
+        self._dirty = True
+
+    def remove(self, item_id):
+        for token in self.item_tokens.pop(item_id, ()):
+            postings = self.postings[token]
+            postings.pop(item_id, None)
+            if not postings:
+                del self.postings[token]
+        self._dirty = True
+
+    def _terms_with_prefix(self, prefix):
+        if self._dirty:
+            self.vocabulary = sorted(self.postings)
+            self._dirty = False
+
+        start = bisect_left(self.vocabulary, prefix)
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, query):
+        """Return the ids of items matching every token of ``query``, best first."""
+        totals = None
+
+        for token in tokenize(query):
+            scores = defaultdict(float)
+            for term in self._terms_with_prefix(token):
+                weight = 1.0 if term == token else PREFIX_WEIGHT
+                for item_id, score in self.postings[term].items():
+                    scores[item_id] = max(scores[item_id], score * weight)
+
+            if totals is None:
+                totals = scores
+            else:
+                totals = {item_id: totals[item_id] + score for item_id, score in scores.items() if item_id in totals}
+
+            if not totals:
+                return []
+
+        if totals is None:
+            return []
+
+        return sorted(totals, key=lambda item_id: (-totals[item_id], item_id))
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return this process's index, rebuilding it if another process changed the menu."""
+    global _index, _index_version
+    from .models import MenuItem
+
+    version = menu_version()
+    with _lock:
+        if _index is None or _index_version != version:
+            _index = MenuSearchIndex(MenuItem.objects.only("id", *FIELD_WEIGHTS))
+            _index_version = version
+        return _index
+
+
+def update_index(item, deleted=False):
+    """Apply one item change to this process's index and adopt the new menu version."""
+    global _index_version
+
+    with _lock:
+        if _index is None:
+            return
+        if deleted:
+            _index.remove(item.pk)
+        else:
+            _index.add(item)
+        _index_version = menu_version()
+
+
+def _postgres_search(query):
+    from .models import MenuItem
+
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    # Raw tsquery so every token also matches as a prefix ("inj" -> injera).
+    search_query = SearchQuery(" & ".join(f"{token}:*" for token in tokens), config="simple", search_type="raw")
+    return list(
+        MenuItem.objects.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def search_menu(query):
+    """Return the ids of menu items matching ``query``, most relevant first."""
+    if connection.vendor == "postgresql":
+        return _postgres_search(query)
+    return get_index().search(query)
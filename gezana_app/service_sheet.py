@@ -0,0 +1,163 @@
+"""
+The front-of-house service sheet: a date's bookings and the covers arriving
+per table and slot, as HTML, CSV or plain text.
+"""
+import csv
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from .availability import date_cache_key
+from .booking_io import Echo
+from .models import Booking
+from .timeslots import start_times
+
+SHEET_FORMATS = ("html", "csv", "text")
+UNSEATED = "Unassigned"
+BOOKING_FIELDS = (
+    "pk",
+    "time",
+    "reference",
+    "name",
+    "guests",
+    "phone",
+    "table__table_number",
+    "joined_tables__table_number",
+)
+
+
+def build_sheet(booking_date):
+    """
+    Return the service sheet data for ``booking_date`` from a single query.
+
+    A booking at joined tables comes back once per joined table and is folded
+    into one entry here; its covers count against its first table. Slots are
+    the offered start times plus any other time a booking starts at.
+    """
+    rows = (
+        Booking.objects.filter(date=booking_date)
+        .order_by("time", "table__table_number", "pk", "joined_tables__table_number")
+        .values_list(*BOOKING_FIELDS)
+    )
+
+    bookings = {}
+    for pk, booking_time, reference, name, guests, phone, table, joined in rows:
+        booking = bookings.get(pk)
+        if booking is None:
+            booking = bookings[pk] = {
+                "time": booking_time,
+                "reference": reference,
+                "name": name,
+                "guests": guests,
+                "phone": phone,
+                "tables": [table] if table else [],
+            }
+        if joined:
+            booking["tables"].append(joined)
+
+    times = sorted(set(start_times()) | {booking["time"] for booking in bookings.values()})
+    column = {slot: index for index, slot in enumerate(times)}
+    cells = defaultdict(lambda: [0] * len(times))
+    parties = defaultdict(int)
+    slot_covers = [0] * len(times)
+
+    for booking in bookings.values():
+        label = booking["tables"][0] if booking["tables"] else UNSEATED
+        index = column[booking["time"]]
+        cells[label][index] += booking["guests"]
+        parties[label] += 1
+        slot_covers[index] += booking["guests"]
+
+    labels = sorted(label for label in cells if label != UNSEATED)
+    if UNSEATED in cells:
+        labels.append(UNSEATED)
+
+    return {
+        "date": booking_date,
+        "times": times,
+        "tables": [
+            {"table": label, "cells": cells[label], "parties": parties[label], "covers": sum(cells[label])}
+            for label in labels
+        ],
+        "slot_covers": slot_covers,
+        "parties": len(bookings),
+        "covers": sum(slot_covers),
+        "bookings": [
+            {**booking, "tables": " + ".join(booking["tables"]) or UNSEATED} for booking in bookings.values()
+        ],
+    }
+
+
+def _html(sheet):
+    return render_to_string("gezana_app/service_sheet.html", {"sheet": sheet})
+
+
+def _csv(sheet):
+    writer = csv.writer(Echo())
+    times = [slot.strftime("%H:%M") for slot in sheet["times"]]
+    lines = [writer.writerow(["table", *times, "parties", "covers"])]
+    lines.extend(
+        writer.writerow([row["table"], *row["cells"], row["parties"], row["covers"]]) for row in sheet["tables"]
+    )
+    lines.append(writer.writerow(["total", *sheet["slot_covers"], sheet["parties"], sheet["covers"]]))
+    lines.append(writer.writerow([]))
+    lines.append(writer.writerow(["time", "reference", "name", "guests", "phone", "tables"]))
+    lines.extend(
+        writer.writerow(
+            [
+                booking["time"].strftime("%H:%M"),
+                booking["reference"],
+                booking["name"],
+                booking["guests"],
+                booking["phone"],
+                booking["tables"],
+            ]
+        )
+        for booking in sheet["bookings"]
+    )
+    return "".join(lines)
+
+
+def _text(sheet):
+    def grid_line(label, values, parties, covers):
+        cells = "".join(f"{value or '.':>6}" for value in values)
+        return f"{label:<12}{cells}{parties:>9}{covers:>8}"
+
+    lines = [
+        f"Service sheet {sheet['date'].isoformat()}: {sheet['parties']} parties, {sheet['covers']} covers",
+        "",
+        grid_line("Table", [slot.strftime("%H:%M") for slot in sheet["times"]], "Parties", "Covers"),
+    ]
+    lines.extend(grid_line(row["table"], row["cells"], row["parties"], row["covers"]) for row in sheet["tables"])
+    lines.append(grid_line("Total", sheet["slot_covers"], sheet["parties"], sheet["covers"]))
+    lines.extend(["", f"{'Time':<7}{'Reference':<11}{'Guests':>6}  {'Tables':<16}{'Name':<30}Phone"])
+    lines.extend(
+        f"{booking['time'].strftime('%H:%M'):<7}{booking['reference']:<11}{booking['guests']:>6}  "
+        f"{booking['tables']:<16}{booking['name'][:29]:<30}{booking['phone']}".rstrip()
+        for booking in sheet["bookings"]
+    )
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {"html": _html, "csv": _csv, "text": _text}
+
+
+def render_sheet(booking_date, file_format="html"):
+    """
+    Return the service sheet for ``booking_date`` in ``file_format``.
+
+    The data and each rendering are cached until the next booking write for
+    the date, which drops them through ``invalidate_date``.
+    """
+    key = date_cache_key(booking_date, "service-sheet")
+    cached = cache.get(key) or {}
+
+    if file_format not in cached:
+        if "sheet" not in cached:
+            cached["sheet"] = build_sheet(booking_date)
+        cached[file_format] = RENDERERS[file_format](cached["sheet"])
+        cache.set(key, cached, settings.SERVICE_SHEET_CACHE_TIMEOUT)
+
+    return cached[file_format]
@@ -0,0 +1,199 @@
+from collections import defaultdict
+from time import sleep
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from .allocation import DayAvailability, plan_seating
+from .availability import invalidate_date
+from .models import Booking, SlotOccupancy, SlotTaken, Table
+
+# Namespace for pg_advisory_xact_lock(namespace, date) so our per-date locks
+# cannot collide with advisory locks taken by anything else in the database.
+ADVISORY_LOCK_NAMESPACE = 4752
+LOCK_RETRIES = 5
+LOCK_RETRY_DELAY = 0.05
+
+
+def lock_date(booking_date):
+    """
+    Serialise allocations for ``booking_date`` until the transaction ends.
+
+    PostgreSQL gets an advisory lock per date, so bookings for other dates
+    never wait. Other backends fall back to locking the table rows, and
+    SQLite serialises writers on its own. Returns True when the caller must
+    select the table rows for update itself.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [ADVISORY_LOCK_NAMESPACE, booking_date.toordinal()],
+            )
+        return False
+
+    return connection.vendor != "sqlite"
+
+
+def choose_tables(availability, booking):
+    """
+    Return the tables ``booking`` should get from ``availability``, largest first.
+
+    Raises ``ValidationError`` when the party is too large, the slot is full
+    or the guest already has a booking that day.
+    """
+    if booking.guests > availability.max_capacity:
+        raise ValidationError(
+            "No tables can accommodate that party size. Please reduce guests."
+        )
+
+    tables = availability.find_seating(booking.time, booking.guests)
+
+    if tables is None:
+        raise ValidationError(
+            "We are fully booked for that date and time. Please choose another slot."
+        )
+
+    if availability.has_booking_for(email=booking.email, phone=booking.phone):
+        raise ValidationError(
+            "It looks like you already have a booking for that date."
+        )
+
+    return tables
+
+
+def _place_booking(booking, on_placed):
+    lock_tables = lock_date(booking.date)
+    availability = DayAvailability.load(
+        booking.date,
+        exclude_booking_id=booking.pk,
+        lock=lock_tables,
+    )
+
+    booking.seat_at(choose_tables(availability, booking))
+    booking.save()
+
+    if on_placed:
+        on_placed(booking)
+    return booking
+
+
+def place_booking(booking, on_placed=None):
+    """
+    Allocate a table for ``booking`` and save it in a single transaction.
+
+    Capacity, free-table and duplicate checks all run against one load of the
+    day's bookings while the date is locked, so two concurrent requests cannot
+    be given the same table. Works for new bookings and for edits, where the
+    booking's own current slot is ignored. ``on_placed(booking)`` runs inside
+    the same transaction, e.g. to queue the confirmation email. Raises
+    ``ValidationError`` with a guest-facing message when the booking cannot
+    be placed.
+    """
+    for attempt in range(LOCK_RETRIES):
+        try:
+            with transaction.atomic():
+                return _place_booking(booking, on_placed)
+        except OperationalError:
+            # SQLite reports "database is locked" to the losing writer instead
+            # of waiting; retry unless we are inside somebody else's transaction.
+            if attempt == LOCK_RETRIES - 1 or connection.in_atomic_block:
+                raise
+            sleep(LOCK_RETRY_DELAY * (attempt + 1))
+        except SlotTaken:
+            # Another writer took the table between our load and our insert
+            # (only possible where the date lock is advisory); reload and
+            # choose again.
+            if attempt == LOCK_RETRIES - 1 or connection.in_atomic_block:
+                raise
+        except IntegrityError:
+            # Booking.save clears a freshly generated reference that hit the
+            # unique constraint; retry the whole transaction with a new one.
+            if attempt == LOCK_RETRIES - 1 or booking.reference or connection.in_atomic_block:
+                raise
+
+
+def remove_booking(booking, on_removed=None):
+    """
+    Delete ``booking``, calling ``on_removed(booking)`` in the same transaction.
+
+    The date is locked like for a placement, so a cancellation cannot land
+    in the middle of reoptimize_date reseating the day.
+    """
+    for attempt in range(LOCK_RETRIES):
+        try:
+            with transaction.atomic():
+                if lock_date(booking.date):
+                    list(Table.objects.select_for_update().values_list("pk", flat=True))
+                if on_removed:
+                    on_removed(booking)
+                booking.delete()
+                return
+        except OperationalError:
+            # SQLite's "database is locked", as in place_booking.
+            if attempt == LOCK_RETRIES - 1 or connection.in_atomic_block:
+                raise
+            sleep(LOCK_RETRY_DELAY * (attempt + 1))
+
+
+def _write_seating(bookings, plan):
+    """Move ``bookings`` to their tables in ``plan``; returns those that moved."""
+    Joined = Booking.joined_tables.through
+    joined = defaultdict(set)
+    for booking_id, table_id in Joined.objects.filter(booking__in=bookings).values_list("booking_id", "table_id"):
+        joined[booking_id].add(table_id)
+
+    moved = []
+    for booking in bookings:
+        seating = plan[booking.pk]
+        if (seating[0].pk, {table.pk for table in seating[1:]}) != (booking.table_id, joined[booking.pk]):
+            booking.seat_at(seating)
+            # A copy loaded before the move must not write the old table back.
+            booking.version += 1
+            moved.append(booking)
+
+    # Moved bookings may swap tables, so clear all their slots before
+    # writing any, or the ledger constraint would trip halfway.
+    SlotOccupancy.objects.filter(booking__in=moved).delete()
+    Joined.objects.filter(booking__in=moved).delete()
+    Booking.objects.bulk_update(moved, ["table", "version"])
+    Joined.objects.bulk_create(
+        Joined(booking_id=booking.pk, table_id=table_id) for booking in moved for table_id in booking.joined_table_ids
+    )
+    SlotOccupancy.objects.bulk_create(SlotOccupancy.rows_for(moved))
+    return moved
+
+
+def reoptimize_date(booking_date):
+    """
+    Reseat every booking of ``booking_date`` to leave the most covers bookable.
+
+    Bookings keep their tables in the order they arrived, and cancellations
+    leave holes; plan_seating seats the whole day again from scratch. The
+    plan is written in one transaction with the date locked, and only if it
+    leaves more covers for sale than the current seating. Returns
+    ``(bookings_moved, covers_before, covers_after)``.
+    """
+    with transaction.atomic():
+        lock_tables = lock_date(booking_date)
+        tables = Table.objects.only("id", "table_number", "capacity", "combine_group")
+        if lock_tables:
+            tables = tables.select_for_update()
+
+        current = DayAvailability.load(booking_date, tables=tables)
+        before = current.bookable_covers()
+
+        bookings = list(
+            Booking.objects.filter(date=booking_date, table__isnull=False).only(
+                "date", "time", "guests", "table", "version"
+            )
+        )
+        planned = plan_seating(booking_date, current.tables, bookings)
+        if planned is None or planned[1] <= before:
+            return 0, before, before
+
+        moved = _write_seating(bookings, planned[0])
+
+    # bulk_update sends no post_save signals.
+    invalidate_date(booking_date)
+    return len(moved), before, planned[1]
@@ -0,0 +1,46 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import invalidate_date, invalidate_tables
+from .menu_cache import invalidate_menu
+from .models import Booking, MenuItem, Table
+from .search import update_index
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_date(sender, instance, **kwargs):
+    # After the commit: a request reading the date before then would cache
+    # the old bookings again, for the whole timeout.
+    transaction.on_commit(partial(invalidate_date, instance.date))
+
+    # An edit that moves the booking also frees its original date.
+    loaded_date = getattr(instance, "_loaded_date", None)
+    if loaded_date and loaded_date != instance.date:
+        transaction.on_commit(partial(invalidate_date, loaded_date))
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def invalidate_table_layout(sender, instance, **kwargs):
+    invalidate_tables()
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def invalidate_menu_pages(sender, instance, **kwargs):
+    # Bumped before the commit, the new version would be cached with the old rows.
+    transaction.on_commit(invalidate_menu)
+
+
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, **kwargs):
+    update_index(instance)
+
+
+@receiver(post_delete, sender=MenuItem)
+def unindex_menu_item(sender, instance, **kwargs):
+    update_index(instance, deleted=True)
@@ -0,0 +1,46 @@
+"""
+The booking confirmation page's data, carried in its URL.
+
+The party's name, date, time and size are signed into a short-lived token
+in the redirect after booking, so showing them needs neither the session nor
+a query. The token is signed, not encrypted, and URLs end up in logs and
+browser history, so it carries nothing that gives access to the booking:
+no reference, email or phone. The guest gets the reference in the flashed
+confirmation message and the email.
+"""
+from datetime import date, time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+SALT = "gezana_app.booking-success"
+TOKEN_PARAMETER = "token"
+
+
+def success_url(booking):
+    """Return the confirmation page URL for the just placed ``booking``."""
+    token = signing.dumps(
+        {
+            "name": booking.name,
+            "guests": booking.guests,
+            "date": booking.date.isoformat(),
+            "time": booking.time.isoformat("minutes"),
+        },
+        salt=SALT,
+        compress=True,
+    )
+    return f"{reverse('gezana_app:booking_success')}?{urlencode({TOKEN_PARAMETER: token})}"
+
+
+def read_token(token):
+    """Return the booking details in ``token``, or None if it is forged or expired."""
+    try:
+        details = signing.loads(token, salt=SALT, max_age=settings.BOOKING_SUCCESS_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+    details["date"] = date.fromisoformat(details["date"])
+    details["time"] = time.fromisoformat(details["time"])
+    return details
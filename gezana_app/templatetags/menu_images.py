@@ -0,0 +1,52 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+def _srcset(names):
+    return ", ".join(
+        f"{default_storage.url(name)} {width}w"
+        for width, name in sorted(names.items(), key=lambda pair: int(pair[0]))
+    )
+
+
+@register.simple_tag
+def menu_picture(item, sizes="400px", css_class="", lazy=True):
+    """
+    Render ``item``'s image as a <picture> offering the pre-sized derivatives.
+
+    Browsers pick the smallest WebP (or JPEG) that covers ``sizes``; items
+    without derivatives fall back to a plain <img> of ``item.image_url``.
+    """
+    variants = item.image_variants or {}
+    loading = "lazy" if lazy else "eager"
+
+    if not variants.get("jpeg"):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">',
+            item.image_url,
+            item.name,
+            css_class,
+            loading,
+        )
+
+    jpeg = variants["jpeg"]
+    smallest = jpeg[min(jpeg, key=int)]
+    sources = format_html_join(
+        "",
+        '<source type="image/webp" srcset="{}" sizes="{}">',
+        [(_srcset(variants["webp"]), sizes)] if variants.get("webp") else [],
+    )
+
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}"></picture>',
+        sources,
+        default_storage.url(smallest),
+        _srcset(jpeg),
+        sizes,
+        item.name,
+        css_class,
+        loading,
+    )
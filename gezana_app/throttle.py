@@ -0,0 +1,184 @@
+"""
+Token-bucket throttling for the public booking forms.
+
+Buckets live in the cache named by THROTTLE_CACHE: locmem throttles per
+process, a shared store such as Redis or Memcached throttles across every
+worker. A bucket is one cache entry holding ``(tokens, updated)``, and an
+absent entry is a full bucket. Reading and writing it are two cache calls,
+so two requests racing for the last token may both get it; that is close
+enough for abuse control and keeps an allowed request to two cache calls.
+"""
+import hashlib
+import math
+import time
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+THROTTLE_PREFIX = "gezana:throttle"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """Return ``(capacity, seconds per token)`` for a ``"N/period"`` rate, or None when it is off."""
+    if not rate:
+        return None
+    count, period = rate.split("/")
+    return int(count), PERIODS[period] / int(count)
+
+
+def _refill(state, capacity, interval, now):
+    """Return ``(new_state, wait)``: a token was taken when ``wait`` is 0."""
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, updated = state
+        tokens = min(capacity, tokens + (now - updated) / interval)
+
+    if tokens < 1:
+        return None, (1 - tokens) * interval
+    return (tokens - 1, now), 0
+
+
+def _expiry(capacity, interval):
+    # Left alone, the bucket is full again within a period; let it expire.
+    return math.ceil(capacity * interval)
+
+
+def take(key, rate):
+    """Take a token from bucket ``key``; returns 0, or the seconds until one is free."""
+    parsed = parse_rate(rate)
+    if parsed is None:
+        return 0
+
+    store = caches[settings.THROTTLE_CACHE]
+    capacity, interval = parsed
+    state, wait = _refill(store.get(key), capacity, interval, time.time())
+    if state is not None:
+        store.set(key, state, _expiry(capacity, interval))
+    return wait
+
+
+async def atake(key, rate):
+    parsed = parse_rate(rate)
+    if parsed is None:
+        return 0
+
+    store = caches[settings.THROTTLE_CACHE]
+    capacity, interval = parsed
+    state, wait = _refill(await store.aget(key), capacity, interval, time.time())
+    if state is not None:
+        await store.aset(key, state, _expiry(capacity, interval))
+    return wait
+
+
+def _given_back(state, rate):
+    capacity, interval = parse_rate(rate)
+    tokens, updated = state
+    return (min(capacity, tokens + 1), updated), _expiry(capacity, interval)
+
+
+def refund(request):
+    """
+    Give back the tokens ``request`` took, e.g. for a form the guest has to
+    correct: only attempts that got as far as the database count.
+    """
+    store = caches[settings.THROTTLE_CACHE]
+    for key, rate in getattr(request, "throttle_taken", ()):
+        state = store.get(key)
+        if state is not None:
+            store.set(key, *_given_back(state, rate))
+    request.throttle_taken = []
+
+
+async def arefund(request):
+    store = caches[settings.THROTTLE_CACHE]
+    for key, rate in getattr(request, "throttle_taken", ()):
+        state = await store.aget(key)
+        if state is not None:
+            await store.aset(key, *_given_back(state, rate))
+    request.throttle_taken = []
+
+
+def client_ip(request):
+    header = settings.THROTTLE_CLIENT_IP_HEADER
+    if header and request.META.get(header):
+        # The trusted proxy appends the address it saw; earlier entries are
+        # whatever the client sent.
+        return request.META[header].rsplit(",", 1)[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _key(scope, value):
+    # Hashed: the values come from the request and may not be valid cache keys.
+    return f"{THROTTLE_PREFIX}:{scope}:{hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def _buckets(request, scope, reference_field, kwargs):
+    """Yield the ``(key, rate)`` buckets a request to ``scope`` draws from; those with no rate are off."""
+    rate = settings.THROTTLE_RATES.get(scope)
+    if rate:
+        yield _key(scope, client_ip(request)), rate
+
+    reference = ""
+    if reference_field:
+        # In the URL, e.g. /book/<reference>/, or else in the posted form.
+        reference = (kwargs.get(reference_field) or request.POST.get(reference_field, "")).strip().upper()
+    rate = settings.THROTTLE_RATES.get("reference")
+    if reference and rate:
+        yield _key("reference", reference), rate
+
+
+def _too_many(wait):
+    response = HttpResponse("Too many requests. Please try again later.", status=429, content_type="text/plain")
+    response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+def throttle(scope, reference_field=None, methods=("POST",)):
+    """
+    Limit requests in ``methods`` to the view to ``THROTTLE_RATES[scope]`` per client IP.
+
+    With ``reference_field``, the booking reference in that URL argument or
+    posted field is also limited to ``THROTTLE_RATES["reference"]``, wherever
+    the requests come from. Over a limit the view never runs, so no query is
+    made: the response is a 429 with Retry-After. The view can give its
+    tokens back with refund(). Works on sync and async views.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method in methods and settings.THROTTLE_ENABLED:
+                    request.throttle_taken = []
+                    for key, rate in _buckets(request, scope, reference_field, kwargs):
+                        wait = await atake(key, rate)
+                        if wait:
+                            await arefund(request)
+                            return _too_many(wait)
+                        request.throttle_taken.append((key, rate))
+                return await view(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods and settings.THROTTLE_ENABLED:
+                request.throttle_taken = []
+                for key, rate in _buckets(request, scope, reference_field, kwargs):
+                    wait = take(key, rate)
+                    if wait:
+                        refund(request)
+                        return _too_many(wait)
+                    request.throttle_taken.append((key, rate))
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,54 @@
+from datetime import time
+
+BOOKING_DURATION_MINUTES = 90
+BUFFER_MINUTES = 0
+# Granularity of the SlotOccupancy ledger; booking times are offered on it.
+SLOT_MINUTES = 30
+MINUTES_PER_DAY = 24 * 60
+# First and last start times offered to guests.
+OPEN_TIME = time(12, 0)
+CLOSE_TIME = time(19, 0)
+
+
+def _minutes(value):
+    """Return a ``datetime.time`` as minutes since midnight."""
+    return value.hour * 60 + value.minute
+
+
+def booking_window(booking_time):
+    """
+    Return the (start, end) window in minutes for a booking at ``booking_time``.
+
+    The window is widened to whole slots, so a booking at 13:00 holds 13:00 to
+    14:30 and one at 13:10 holds 13:00 to 15:00, exactly the slots it takes in
+    the ledger.
+    """
+    start = _minutes(booking_time)
+    end = start + BOOKING_DURATION_MINUTES + BUFFER_MINUTES
+    return start // SLOT_MINUTES * SLOT_MINUTES, -(-end // SLOT_MINUTES) * SLOT_MINUTES
+
+
+# Length of a slot aligned booking window.
+SEATING_MINUTES = booking_window(time(0))[1]
+
+
+def service_window():
+    """Return the (start, end) minutes between the first seating and the end of the last."""
+    return _minutes(OPEN_TIME), booking_window(CLOSE_TIME)[1]
+
+
+def start_times():
+    """Return every start time offered to guests, OPEN_TIME to CLOSE_TIME."""
+    return [
+        time(minutes // 60, minutes % 60)
+        for minutes in range(_minutes(OPEN_TIME), _minutes(CLOSE_TIME) + 1, SLOT_MINUTES)
+    ]
+
+
+def occupied_slots(booking_time):
+    """Return the start times of the ledger slots a booking at ``booking_time`` takes."""
+    start, end = booking_window(booking_time)
+    return [
+        time(minutes // 60, minutes % 60)
+        for minutes in range(start, min(end, MINUTES_PER_DAY), SLOT_MINUTES)
+    ]
@@ -11,9 +11,12 @@ urlpatterns = [
     path("menu/", views.menu_list, name="menu_list"),
     path("menu/<int:pk>/", views.menu_detail, name="menu_detail"),
     path("book/", views.make_booking, name="make_booking"),
+    path("book/availability/", views.booking_availability, name="booking_availability"),
     path("booking/success/", views.booking_success, name="booking_success"),
     path("booking/manage/", views.manage_booking, name="manage_booking"),
     path("booking/<str:reference>/", views.booking_detail, name="booking_detail"),
     path("booking/<str:reference>/edit/", views.edit_booking, name="edit_booking"),
     path("cancel/", views.cancel_booking, name="cancel_booking"),
+    path("staff/service-sheet/", views.service_sheet, name="service_sheet"),
+    path("metrics/", views.metrics, name="metrics"),
 ]
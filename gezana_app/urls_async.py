@@ -0,0 +1,22 @@
+from django.urls import path
+
+from . import views_async
+from .urls import app_name  # noqa: F401
+from .urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEW_NAMES = {
+    "menu_list",
+    "menu_detail",
+    "make_booking",
+    "manage_booking",
+    "booking_detail",
+    "cancel_booking",
+}
+
+# Same routes and names as urls.py, with the async views swapped in.
+urlpatterns = [
+    path(str(pattern.pattern), getattr(views_async, pattern.name), name=pattern.name)
+    if pattern.name in ASYNC_VIEW_NAMES
+    else pattern
+    for pattern in sync_urlpatterns
+]
@@ -1,49 +1,92 @@
+from datetime import date
+
 from django.conf import settings
 from django.contrib import messages
-from django.core.mail import EmailMultiAlternatives
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
 from django.db.models import Q
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from .forms import BookingForm, BookingLookupForm, CancelBookingForm
-from .models import Booking, MenuItem
-from .utils import find_available_table
-
-
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.http import condition
+from django.views.static import serve
+
+from .availability import availability_grid
+from .emails import queue_booking_confirmation, queue_cancellation_confirmation
+from .forms import AvailabilityForm, BookingForm, BookingLookupForm, CancelBookingForm, EditBookingForm
+from .menu_cache import cached_menu, menu_etag, menu_last_modified, menu_version
+from .metrics import registry
+from .models import Booking, BookingChanged, MenuItem
+from .page_cache import cache_anonymous_page
+from .search import search_menu
+from .service_sheet import SHEET_FORMATS, render_sheet
+from .services import place_booking, remove_booking
+from .success_page import TOKEN_PARAMETER, read_token, success_url
+from .throttle import refund, throttle
+
+SHEET_CONTENT_TYPES = {"html": "text/html", "csv": "text/csv", "text": "text/plain"}
+# Saves of one edit that may lose the race to another write before giving up.
+EDIT_ATTEMPTS = 3
+# Category filters whose menu lists are cached, plus the unfiltered list.
+LISTED_CATEGORIES = {None, "", *dict(MenuItem.CATEGORY_CHOICES)}
+
+
+@cache_anonymous_page
 def home(request):
     return render(request, "gezana_app/home.html")
 
 
+@cache_anonymous_page
 def about(request):
     return render(request, "gezana_app/about.html")
 
 
+@cache_anonymous_page
 def contact(request):
     return render(request, "gezana_app/contact.html")
 
 
+# Caches may keep menu pages but must revalidate them, which the validators make cheap.
+@cache_control(no_cache=True)
+@condition(etag_func=menu_etag, last_modified_func=menu_last_modified)
 def menu_list(request):
     category = request.GET.get("category")
     search = request.GET.get("search")
 
-    items = MenuItem.objects.all()
+    def load_items():
+        items = MenuItem.objects.all()
 
-    if category:
-        items = items.filter(category=category)
+        if category:
+            items = items.filter(category=category)
 
-    if search:
-        items = items.filter(
-            Q(name__icontains=search)
-            | Q(description__icontains=search)
-            | Q(ingredients__icontains=search)
-        )
+        if search:
+            ranked_ids = search_menu(search)
+            matches = items.in_bulk(ranked_ids)
+            return [matches[pk] for pk in ranked_ids if pk in matches]
+
+        return list(items)
+
+    # Search terms and unknown categories come straight from the query string;
+    # caching their results would let any request add cache entries.
+    cache_grid = not search and category in LISTED_CATEGORIES
+    if not cache_grid:
+        items = load_items()
+    else:
+        items = cached_menu(("list", category or None), load_items)
 
     recommended = None
     if not category and not search:
-        recommended = (
-            MenuItem.objects.filter(
-                Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True)
-            )
-            .order_by("-is_chef_choice", "-is_popular", "-is_new")[:3]
+        recommended = cached_menu(
+            ("recommended",),
+            lambda: list(
+                MenuItem.objects.filter(
+                    Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True)
+                )
+                .order_by("-is_chef_choice", "-is_popular", "-is_new")[:3]
+            ),
         )
 
     return render(
@@ -54,26 +97,42 @@ def menu_list(request):
             "recommended": recommended,
             "category": category,
             "search": search,
+            "cache_grid": cache_grid,
+            "menu_version": menu_version(),
+            "fragment_timeout": settings.MENU_FRAGMENT_CACHE_TIMEOUT,
         },
     )
 
 
+@cache_control(no_cache=True)
+@condition(etag_func=menu_etag, last_modified_func=menu_last_modified)
 def menu_detail(request, pk):
-    item = get_object_or_404(MenuItem, pk=pk)
-
-    recommended = (
-        MenuItem.objects.filter(category=item.category)
-        .exclude(pk=item.pk)
-        .order_by("-is_chef_choice", "-is_popular", "-is_new", "name")[:6]
-    )
-
-    if not recommended:
-        recommended = (
-            MenuItem.objects.exclude(pk=item.pk)
-            .filter(Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True))
+    def load_detail():
+        item = MenuItem.objects.filter(pk=pk).first()
+        if item is None:
+            return None
+
+        recommended = list(
+            MenuItem.objects.filter(category=item.category)
+            .exclude(pk=item.pk)
             .order_by("-is_chef_choice", "-is_popular", "-is_new", "name")[:6]
         )
 
+        if not recommended:
+            recommended = list(
+                MenuItem.objects.exclude(pk=item.pk)
+                .filter(Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True))
+                .order_by("-is_chef_choice", "-is_popular", "-is_new", "name")[:6]
+            )
+
+        return item, recommended
+
+    detail = cached_menu(("detail", pk), load_detail)
+    if detail is None:
+        raise Http404("No MenuItem matches the given query.")
+
+    item, recommended = detail
+
     return render(
         request,
         "gezana_app/menu_detail.html",
@@ -84,32 +143,26 @@ def menu_detail(request, pk):
     )
 
 
+@throttle("booking")
 def make_booking(request):
     if request.method == "POST":
         form = BookingForm(request.POST)
 
         if form.is_valid():
-            booking = form.save(commit=False)
-            table = getattr(form, "available_table", None)
-
-            if table is None:
-                table = find_available_table(
-                    booking.date,
-                    booking.time,
-                    booking.guests,
+            try:
+                booking = place_booking(
+                    form.save(commit=False),
+                    on_placed=queue_booking_confirmation,
                 )
-
-            if table is None:
-                messages.error(request, "Sorry, no table is available at that time.")
-                return render(request, "gezana_app/booking_form.html", {"form": form})
-
-            booking.table = table
-            booking.save()
-
-            _send_booking_confirmation(booking)
-            request.session["last_booking_reference"] = booking.reference
-            messages.success(request, "Your booking has been confirmed.")
-            return redirect("gezana_app:booking_success")
+            except ValidationError as exc:
+                form.add_error(None, exc)
+            else:
+                # The reference travels in the message cookie, never in the URL.
+                messages.success(request, f"Your booking has been confirmed. Your reference is {booking.reference}.")
+                return redirect(success_url(booking))
+        else:
+            # Nothing reached the database: a guest correcting the form keeps their allowance.
+            refund(request)
 
         messages.warning(request, "Please correct the highlighted fields and try again.")
 
@@ -119,9 +172,30 @@ def make_booking(request):
     return render(request, "gezana_app/booking_form.html", {"form": form})
 
 
+@throttle("availability", methods=("GET", "HEAD"))
+def booking_availability(request):
+    form = AvailabilityForm(request.GET)
+
+    if not form.is_valid():
+        refund(request)
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    booking_date = form.cleaned_data["date"]
+    guests = form.cleaned_data["guests"]
+    slots = [slot for slot, _ in BookingForm.TIME_CHOICES]
+
+    return JsonResponse(
+        {
+            "date": booking_date.isoformat(),
+            "guests": guests,
+            "slots": availability_grid(booking_date, guests, slots),
+        }
+    )
+
+
+@never_cache
 def booking_success(request):
-    reference = request.session.pop("last_booking_reference", None)
-    booking = Booking.objects.filter(reference=reference).first() if reference else None
+    booking = read_token(request.GET.get(TOKEN_PARAMETER, ""))
 
     if not booking:
         messages.info(
@@ -133,6 +207,7 @@ def booking_success(request):
     return render(request, "gezana_app/booking_success.html", {"booking": booking})
 
 
+@throttle("lookup", reference_field="reference")
 def manage_booking(request):
     form = BookingLookupForm(request.POST or None)
 
@@ -156,53 +231,78 @@ def manage_booking(request):
             request,
             "We could not find a booking matching those details. Please try again.",
         )
+    elif request.method == "POST":
+        # A form to correct made no lookup, so it does not count.
+        refund(request)
 
     return render(request, "gezana_app/manage_booking.html", {"form": form})
 
 
+# A 404 tells whether a reference exists, so the reference in the URL is
+# throttled like the lookup form; opening a real booking gives its tokens back.
+@throttle("lookup", reference_field="reference", methods=("GET", "HEAD"))
 def booking_detail(request, reference):
     booking = get_object_or_404(Booking, reference=reference.upper())
+    refund(request)
     return render(request, "gezana_app/booking_detail.html", {"booking": booking})
 
 
+def _save_edit(form):
+    """
+    Save a valid EditBookingForm; returns ``(form, booking)``, booking None on errors.
+
+    The save only applies to the version it loaded. When the booking moved on
+    before or during the save, the edit is merged onto a fresh copy and tried
+    again. Raises Booking.DoesNotExist once the booking has been cancelled.
+    """
+    edit = form
+    # Forms rendered before versions existed post none; take the loaded one.
+    stale = form.cleaned_data["version"] not in (None, form.instance.version)
+
+    for attempt in range(EDIT_ATTEMPTS):
+        if stale:
+            # Validation already copied the posted values onto form.instance.
+            edit = form.rebase(Booking.objects.get(pk=form.instance.pk))
+            if not edit.is_valid():
+                return edit, None
+
+        try:
+            return edit, place_booking(edit.save(commit=False))
+        except BookingChanged:
+            stale = True
+        except ValidationError as exc:
+            edit.add_error(None, exc)
+            return edit, None
+
+    edit.add_error(None, "This booking is being changed elsewhere right now. Please try again.")
+    return edit, None
+
+
+@throttle("lookup", reference_field="reference", methods=("GET", "HEAD", "POST"))
 def edit_booking(request, reference):
     booking = get_object_or_404(Booking, reference=reference.upper())
+    refund(request)
 
     if request.method == "POST":
-        form = BookingForm(request.POST, instance=booking)
+        form = EditBookingForm(request.POST, instance=booking)
 
         if form.is_valid():
-            updated_booking = form.save(commit=False)
-            table = getattr(form, "available_table", None)
-
-            if table is None:
-                table = find_available_table(
-                    updated_booking.date,
-                    updated_booking.time,
-                    updated_booking.guests,
-                    exclude_booking_id=booking.pk,
-                )
-
-            if table is None:
-                messages.error(request, "Sorry, no table is available at that time.")
-                return render(
-                    request,
-                    "gezana_app/edit_booking.html",
-                    {"form": form, "booking": booking},
+            try:
+                form, updated_booking = _save_edit(form)
+            except Booking.DoesNotExist:
+                messages.error(request, "This booking has been cancelled.")
+                return redirect("gezana_app:manage_booking")
+
+            if updated_booking:
+                messages.success(request, "Your booking has been updated successfully.")
+                return redirect(
+                    "gezana_app:booking_detail",
+                    reference=updated_booking.reference,
                 )
 
-            updated_booking.table = table
-            updated_booking.save()
-
-            messages.success(request, "Your booking has been updated successfully.")
-            return redirect(
-                "gezana_app:booking_detail",
-                reference=updated_booking.reference,
-            )
-
         messages.warning(request, "Please correct the highlighted fields and try again.")
     else:
-        form = BookingForm(instance=booking)
+        form = EditBookingForm(instance=booking)
 
     return render(
         request,
@@ -211,6 +311,7 @@ def edit_booking(request, reference):
     )
 
 
+@throttle("cancel", reference_field="reference")
 def cancel_booking(request):
     if request.method == "POST":
         form = CancelBookingForm(request.POST)
@@ -220,90 +321,58 @@ def cancel_booking(request):
 
             try:
                 booking = Booking.objects.get(reference=reference)
-                _send_cancellation_confirmation(booking)
-                booking.delete()
+                remove_booking(booking, on_removed=queue_cancellation_confirmation)
                 messages.success(request, "Your booking has been cancelled.")
                 return redirect("gezana_app:home")
             except Booking.DoesNotExist:
                 messages.error(request, "Invalid cancellation code.")
+        else:
+            # A form to correct tried no code, so it does not count.
+            refund(request)
     else:
         form = CancelBookingForm()
 
     return render(request, "gezana_app/cancel_booking.html", {"form": form})
 
 
-def _send_booking_confirmation(booking):
-    if not booking.email:
-        return
-
-    subject = "Your Gezana booking is confirmed"
-    text_body = (
-        f"Hi {booking.name},\n\n"
-        f"Your table is booked for {booking.date} at {booking.time}.\n"
-        f"Guests: {booking.guests}\n"
-        f"Reference: {booking.reference}\n\n"
-        "Thank you for choosing Gezana Restaurant."
-    )
-
-    html_body = f"""
-    <div style="font-family: Arial, sans-serif; color: #2d1d16;">
-      <h2 style="color:#8c3c1c;">Gezana Booking Confirmed</h2>
-      <p>Hi {booking.name},</p>
-      <p>Your booking has been confirmed.</p>
-      <ul style="list-style:none; padding:0;">
-        <li><strong>Date:</strong> {booking.date}</li>
-        <li><strong>Time:</strong> {booking.time}</li>
-        <li><strong>Guests:</strong> {booking.guests}</li>
-        <li><strong>Reference:</strong> {booking.reference}</li>
-      </ul>
-      <p>Thank you for choosing Gezana.</p>
-    </div>
-    """
-
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[booking.email],
-    )
-    email.attach_alternative(html_body, "text/html")
-    email.send(fail_silently=True)
-
-
-def _send_cancellation_confirmation(booking):
-    if not booking.email:
-        return
+@never_cache
+@staff_member_required
+def service_sheet(request):
+    """The day's bookings and covers per table and slot for the hosts; ?date=YYYY-MM-DD&format=html|csv|text."""
+    try:
+        booking_date = date.fromisoformat(request.GET["date"]) if "date" in request.GET else timezone.localdate()
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date.")
 
-    subject = "Your Gezana booking has been cancelled"
-    text_body = (
-        f"Hi {booking.name},\n\n"
-        f"Your booking for {booking.date} at {booking.time} has been cancelled.\n"
-        f"Reference: {booking.reference}\n\n"
-        "We hope to welcome you another time.\n\n"
-        "Gezana Restaurant"
-    )
-
-    html_body = f"""
-    <div style="font-family: Arial, sans-serif; color: #2d1d16;">
-      <h2 style="color:#8c3c1c;">Booking Cancelled</h2>
-      <p>Hi {booking.name},</p>
-      <p>Your booking has been cancelled.</p>
-      <ul style="list-style:none; padding:0;">
-        <li><strong>Date:</strong> {booking.date}</li>
-        <li><strong>Time:</strong> {booking.time}</li>
-        <li><strong>Guests:</strong> {booking.guests}</li>
-        <li><strong>Reference:</strong> {booking.reference}</li>
-      </ul>
-      <p>We hope to see you soon.</p>
-    </div>
-    """
+    file_format = request.GET.get("format", "html")
+    if file_format not in SHEET_FORMATS:
+        return HttpResponseBadRequest("Unknown format.")
 
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[booking.email],
+    response = HttpResponse(
+        render_sheet(booking_date, file_format),
+        content_type=f"{SHEET_CONTENT_TYPES[file_format]}; charset=utf-8",
     )
-    email.attach_alternative(html_body, "text/html")
-    email.send(fail_silently=True)
-    return redirect("gezana_app:home")
+    if file_format == "csv":
+        response["Content-Disposition"] = f'attachment; filename="service-sheet-{booking_date.isoformat()}.csv"'
+    return response
+
+
+def metrics(request):
+    """Serve the instrumentation histograms in the Prometheus text format."""
+    if not settings.INSTRUMENTATION:
+        raise Http404
+    # Staff can read it in the browser; scrapers send METRICS_TOKEN. With no
+    # token set, staff are the only readers.
+    token = settings.METRICS_TOKEN
+    bearer = request.headers.get("Authorization", "")
+    if not request.user.is_staff and not (token and constant_time_compare(bearer, f"Bearer {token}")):
+        return HttpResponse(status=401)
+
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4")
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """django.views.static.serve for uploads, with far-future caching."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE, immutable=True)
+    return response
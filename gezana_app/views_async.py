@@ -0,0 +1,253 @@
+"""
+Async versions of the booking and menu views, used when ASYNC_VIEWS is on.
+
+Reads go through the async ORM. Writes still run in one transaction, so they
+go through ``sync_to_async``, and so does anything that may touch the
+session: Django 4.2 has no async session API.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+from .emails import queue_booking_confirmation, queue_cancellation_confirmation
+from .forms import BookingForm, BookingLookupForm, CancelBookingForm
+from .menu_cache import acached_menu, amenu_version, menu_etag, menu_last_modified
+from .models import Booking, MenuItem
+from .search import search_menu
+from .services import place_booking, remove_booking
+from .success_page import success_url
+from .throttle import arefund, throttle
+from .views import LISTED_CATEGORIES
+
+# Rendering may read flashed messages from the session.
+arender = sync_to_async(render)
+asearch_menu = sync_to_async(search_menu)
+
+
+def _menu_validators(request):
+    etag = menu_etag(request)
+    last_modified = menu_last_modified(request)
+    return (
+        quote_etag(etag) if etag else None,
+        int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def menu_condition(view):
+    """
+    ``cache_control(no_cache=True)`` and ``condition(menu_etag, menu_last_modified)``
+    for async views; the 4.2 decorators are sync-only.
+    """
+
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        etag, last_modified = await sync_to_async(_menu_validators)(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+
+        if request.method in ("GET", "HEAD"):
+            if last_modified and not response.has_header("Last-Modified"):
+                response.headers["Last-Modified"] = http_date(last_modified)
+            if etag:
+                response.headers.setdefault("ETag", etag)
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    return inner
+
+
+@menu_condition
+async def menu_list(request):
+    category = request.GET.get("category")
+    search = request.GET.get("search")
+
+    async def load_items():
+        items = MenuItem.objects.all()
+
+        if category:
+            items = items.filter(category=category)
+
+        if search:
+            ranked_ids = await asearch_menu(search)
+            matches = await items.ain_bulk(ranked_ids)
+            return [matches[pk] for pk in ranked_ids if pk in matches]
+
+        return [item async for item in items]
+
+    # Search terms and unknown categories come straight from the query string;
+    # caching their results would let any request add cache entries.
+    cache_grid = not search and category in LISTED_CATEGORIES
+    if not cache_grid:
+        items = await load_items()
+    else:
+        items = await acached_menu(("list", category or None), load_items)
+
+    recommended = None
+    if not category and not search:
+
+        async def load_recommended():
+            return [
+                item
+                async for item in MenuItem.objects.filter(
+                    Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True)
+                ).order_by("-is_chef_choice", "-is_popular", "-is_new")[:3]
+            ]
+
+        recommended = await acached_menu(("recommended",), load_recommended)
+
+    return await arender(
+        request,
+        "gezana_app/menu_list.html",
+        {
+            "items": items,
+            "recommended": recommended,
+            "category": category,
+            "search": search,
+            "cache_grid": cache_grid,
+            "menu_version": await amenu_version(),
+            "fragment_timeout": settings.MENU_FRAGMENT_CACHE_TIMEOUT,
+        },
+    )
+
+
+@menu_condition
+async def menu_detail(request, pk):
+    async def load_detail():
+        item = await MenuItem.objects.filter(pk=pk).afirst()
+        if item is None:
+            return None
+
+        ordering = ("-is_chef_choice", "-is_popular", "-is_new", "name")
+        recommended = [
+            other
+            async for other in MenuItem.objects.filter(category=item.category)
+            .exclude(pk=item.pk)
+            .order_by(*ordering)[:6]
+        ]
+
+        if not recommended:
+            recommended = [
+                other
+                async for other in MenuItem.objects.exclude(pk=item.pk)
+                .filter(Q(is_chef_choice=True) | Q(is_popular=True) | Q(is_new=True))
+                .order_by(*ordering)[:6]
+            ]
+
+        return item, recommended
+
+    detail = await acached_menu(("detail", pk), load_detail)
+    if detail is None:
+        raise Http404("No MenuItem matches the given query.")
+
+    item, recommended = detail
+
+    return await arender(
+        request,
+        "gezana_app/menu_detail.html",
+        {
+            "item": item,
+            "recommended": recommended,
+        },
+    )
+
+
+@throttle("booking")
+async def make_booking(request):
+    if request.method == "POST":
+        form = BookingForm(request.POST)
+
+        if form.is_valid():
+            try:
+                booking = await sync_to_async(place_booking)(
+                    form.save(commit=False),
+                    on_placed=queue_booking_confirmation,
+                )
+            except ValidationError as exc:
+                form.add_error(None, exc)
+            else:
+                # The reference travels in the message cookie, never in the URL.
+                messages.success(request, f"Your booking has been confirmed. Your reference is {booking.reference}.")
+                return redirect(success_url(booking))
+        else:
+            # Nothing reached the database: a guest correcting the form keeps their allowance.
+            await arefund(request)
+
+        messages.warning(request, "Please correct the highlighted fields and try again.")
+
+    else:
+        form = BookingForm()
+
+    return await arender(request, "gezana_app/booking_form.html", {"form": form})
+
+
+@throttle("lookup", reference_field="reference")
+async def manage_booking(request):
+    form = BookingLookupForm(request.POST or None)
+
+    if request.method == "POST" and form.is_valid():
+        reference = form.cleaned_data["reference"]
+        email = (form.cleaned_data.get("email") or "").strip()
+        phone = (form.cleaned_data.get("phone") or "").strip()
+
+        filters = Q(reference=reference)
+        if email:
+            filters &= Q(email__iexact=email)
+        elif phone:
+            filters &= Q(phone=phone)
+
+        if await Booking.objects.filter(filters).aexists():
+            return redirect("gezana_app:booking_detail", reference=reference)
+
+        messages.error(
+            request,
+            "We could not find a booking matching those details. Please try again.",
+        )
+    elif request.method == "POST":
+        # A form to correct made no lookup, so it does not count.
+        await arefund(request)
+
+    return await arender(request, "gezana_app/manage_booking.html", {"form": form})
+
+
+@throttle("lookup", reference_field="reference", methods=("GET", "HEAD"))
+async def booking_detail(request, reference):
+    try:
+        booking = await Booking.objects.aget(reference=reference.upper())
+    except Booking.DoesNotExist:
+        raise Http404("No Booking matches the given query.")
+    await arefund(request)
+
+    return await arender(request, "gezana_app/booking_detail.html", {"booking": booking})
+
+
+@throttle("cancel", reference_field="reference")
+async def cancel_booking(request):
+    if request.method == "POST":
+        form = CancelBookingForm(request.POST)
+
+        if form.is_valid():
+            reference = form.cleaned_data["reference"]
+
+            try:
+                booking = await Booking.objects.aget(reference=reference)
+                await sync_to_async(remove_booking)(booking, on_removed=queue_cancellation_confirmation)
+                messages.success(request, "Your booking has been cancelled.")
+                return redirect("gezana_app:home")
+            except Booking.DoesNotExist:
+                messages.error(request, "Invalid cancellation code.")
+        else:
+            # A form to correct tried no code, so it does not count.
+            await arefund(request)
+    else:
+        form = CancelBookingForm()
+
+    return await arender(request, "gezana_app/cancel_booking.html", {"form": form})